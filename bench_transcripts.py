@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from transcripts import Transcript, render_transcript
+
+
+def fake_messages(count):
+    for index in range(count):
+        yield (
+            index,
+            f"user{index % 7}",
+            f"https://cdn.discordapp.com/avatars/{index % 7}/avatar.png",
+            1735732800 + index,
+            f"Message {index} with <b>markup</b> & some longer text about the project scope. " * 3,
+            [("Request Submitted", "Please wait while our team reviews your request.")] if index % 50 == 0 else [],
+            [(f"brief-{index}.pdf", f"https://cdn.discordapp.com/attachments/{index}/brief.pdf")] if index % 20 == 0 else []
+        )
+
+
+def render_legacy(messages):
+    transcript = "<html><body><div class='messages'>"
+    for _, author_name, avatar_url, timestamp, content, embeds, attachments in messages:
+        embeds_html = ""
+        for title, description in embeds:
+            embeds_html += f'<div class="system-message"><strong>{title}</strong><br>{description}<br></div>'
+        attachments_html = ""
+        if attachments:
+            attachments_html = '<div class="message-attachments">'
+            for filename, url in attachments:
+                attachments_html += f'<a href="{url}" target="_blank">{filename}</a> '
+            attachments_html += '</div>'
+        transcript += f"""
+        <div class="message">
+            <div class="message-avatar"><img src="{avatar_url}" alt="{author_name}"/></div>
+            <div class="message-content">
+                <span class="message-author">{author_name}</span>
+                <span class="message-timestamp">{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(timestamp))}</span>
+                <div class="message-text">{content.replace('<', '&lt;').replace('>', '&gt;')}</div>
+                {embeds_html}
+                {attachments_html}
+            </div>
+        </div>
+        """
+    transcript += "</div></body></html>"
+    return len(transcript.encode("utf-8"))
+
+
+def build_transcript(messages):
+    transcript = Transcript("🎫〢client", "client", "staff", "2025-01-01 at 12:00:00 UTC")
+    for message in messages:
+        transcript.add_message(*message)
+    return transcript
+
+
+def render_streaming(messages, compress=False):
+    size = 0
+    for part in build_transcript(messages).render_html(compress=compress):
+        size += part.seek(0, 2)
+        part.close()
+    return size
+
+
+def render_ndjson(messages):
+    export = build_transcript(messages).export_ndjson()
+    size = export.seek(0, 2)
+    export.close()
+    return size
+
+
+def start_worker_pool():
+    os.environ.setdefault("TOKEN", "benchmark")
+    from bot import bot
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(bot.start_transcript_pool())
+    return bot, loop
+
+
+def write_journal(messages, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "start"}) + "\n")
+        for message_id, author_name, avatar_url, timestamp, content, embeds, attachments in messages:
+            f.write(json.dumps({
+                "op": "message",
+                "id": message_id,
+                "author": author_name,
+                "avatar": avatar_url,
+                "ts": timestamp,
+                "content": content,
+                "embeds": embeds,
+                "attachments": attachments
+            }, ensure_ascii=False) + "\n")
+    return os.path.getsize(path)
+
+
+def render_worker(messages, worker):
+    bot, loop = worker
+    directory = tempfile.mkdtemp()
+    try:
+        journal_path = os.path.join(directory, "journal.ndjson")
+        source = (journal_path, write_journal(messages, journal_path), "🎫〢client", "client", "staff", "2025-01-01 at 12:00:00 UTC")
+        paths = loop.run_until_complete(bot.run_transcript_job(render_transcript, source, directory))
+        return sum(os.path.getsize(path) for path in paths)
+    finally:
+        shutil.rmtree(directory)
+
+
+def measure(render, count, **kwargs):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = render(fake_messages(count), **kwargs)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [500, 5000, 50000]
+    worker = start_worker_pool()
+    print(f"{'renderer':<16}{'messages':>10}{'time (ms)':>12}{'peak (KiB)':>12}{'size (KiB)':>12}")
+    for count in counts:
+        for name, render, kwargs in (
+            ("legacy", render_legacy, {}),
+            ("streaming", render_streaming, {}),
+            ("streaming+gzip", render_streaming, {"compress": True}),
+            ("ndjson", render_ndjson, {}),
+            ("worker", render_worker, {"worker": worker}),
+        ):
+            elapsed, peak, size = measure(render, count, **kwargs)
+            print(f"{name:<16}{count:>10}{elapsed * 1000:>12.1f}{peak / 1024:>12.0f}{size / 1024:>12.0f}")
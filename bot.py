@@ -1,18 +1,29 @@
 # -*- coding: utf-8 -*-
 import discord
 from discord import app_commands, TextStyle
-from discord.ext import commands
+from discord.ext import commands, tasks
 import os
 from dotenv import load_dotenv
 import asyncio
 import datetime
-import io
-import requests
+import aiohttp
+from transcripts import JournalTranscript, TranscriptArchive, SPOOL_SIZE, warm_worker, render_transcript, export_transcript
 from typing import Optional, List, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 import time
 import re
+import json
+import random
+import math
+import zlib
+import sqlite3
+import threading
+import hashlib
+import heapq
+import tempfile
+import shutil
+import concurrent.futures
+from collections import OrderedDict, Counter, deque
 
 load_dotenv()
 
@@ -37,16 +48,211 @@ except ValueError:
     print("Error: LOG_CHANNEL ID must be an integer")
     LOG_CHANNEL = 0
 
+TICKET_CATEGORY_NAME = "━━━| 🎫 TICKETS |━━━"
+
 ICON_URL = os.getenv("ICON_URL", "")
 if not ICON_URL:
     print("Warning: No ICON_URL found in .env file. Default icons will not appear in embeds.")
 
+def env_int(name, default):
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        print(f"Warning: {name} must be an integer, using {default}")
+        return default
+
+
+def env_float(name, default):
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        print(f"Warning: {name} must be a number, using {default}")
+        return default
+
+
+HTTP_POOL_LIMIT = env_int("HTTP_POOL_LIMIT", 20)
+HTTP_POOL_LIMIT_PER_HOST = env_int("HTTP_POOL_LIMIT_PER_HOST", 10)
+
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+TRANSCRIPT_COMPRESS = os.getenv("TRANSCRIPT_COMPRESS", "false").lower() == "true"
+TRANSCRIPT_JSON_EXPORT = os.getenv("TRANSCRIPT_JSON_EXPORT", "true").lower() == "true"
+TRANSCRIPT_PREFETCH_PAGES = env_int("TRANSCRIPT_PREFETCH_PAGES", 2)
+TRANSCRIPT_UPLOAD_MARGIN = 512 * 1024
+TRANSCRIPT_INDEX_RETENTION_DAYS = env_int("TRANSCRIPT_INDEX_RETENTION_DAYS", 365)
+ATTACHMENT_ARCHIVE = os.getenv("ATTACHMENT_ARCHIVE", "true").lower() == "true"
+ATTACHMENT_DOWNLOAD_CONCURRENCY = env_int("ATTACHMENT_DOWNLOAD_CONCURRENCY", 4)
+ATTACHMENT_ARCHIVE_MAX_MB = env_int("ATTACHMENT_ARCHIVE_MAX_MB", 200)
+ATTACHMENT_PROGRESS_INTERVAL = 2
+TRANSCRIPT_WORKERS = env_int("TRANSCRIPT_WORKERS", 2)
+TRANSCRIPT_WORK_DIR = os.path.join(DATA_DIR, "transcript-work")
+
+WELCOME_WINDOW = env_float("WELCOME_WINDOW", 5.0)
+WELCOME_MAX_MENTIONS = env_int("WELCOME_MAX_MENTIONS", 10)
+WELCOME_RAID_THRESHOLD = env_int("WELCOME_RAID_THRESHOLD", 30)
+
+TICKET_POOL_SIZE = env_int("TICKET_POOL_SIZE", 0)
+TICKET_POOL_LOW_WATER = env_int("TICKET_POOL_LOW_WATER", TICKET_POOL_SIZE // 2)
+TICKET_POOL_REPLENISH_INTERVAL = env_float("TICKET_POOL_REPLENISH_INTERVAL", 10.0)
+
+VERDICT_CACHE_SIZE = env_int("VERDICT_CACHE_SIZE", 5000)
+VERDICT_CACHE_TTL = env_int("VERDICT_CACHE_TTL", 60 * 60 * 6)
+VERDICT_CACHE_SNAPSHOT = os.getenv("VERDICT_CACHE_SNAPSHOT", "true").lower() == "true"
+
+LOCAL_DELETE_THRESHOLD = env_float("LOCAL_DELETE_THRESHOLD", 0.9)
+LOCAL_REDIRECT_THRESHOLD = env_float("LOCAL_REDIRECT_THRESHOLD", 0.9)
+LOCAL_GOOD_THRESHOLD = env_float("LOCAL_GOOD_THRESHOLD", 0.9)
+
+MODERATION_BATCH_SIZE = env_int("MODERATION_BATCH_SIZE", 8)
+MODERATION_BATCH_WAIT = env_float("MODERATION_BATCH_WAIT", 0.75)
+
+MODERATION_DEGRADED_MODE = os.getenv("MODERATION_DEGRADED_MODE", "local").lower()
+if MODERATION_DEGRADED_MODE not in ("local", "allow"):
+    print("Warning: MODERATION_DEGRADED_MODE must be local or allow, using local")
+    MODERATION_DEGRADED_MODE = "local"
+MODERATION_DEGRADED_THRESHOLD = env_float("MODERATION_DEGRADED_THRESHOLD", 0.8)
+
+MODERATION_QUEUE_SIZE = env_int("MODERATION_QUEUE_SIZE", 200)
+MODERATION_WORKERS = env_int("MODERATION_WORKERS", 4)
+MODERATION_OVERFLOW = os.getenv("MODERATION_OVERFLOW", "local_only").lower()
+if MODERATION_OVERFLOW not in ("drop_oldest", "local_only", "block"):
+    print("Warning: MODERATION_OVERFLOW must be drop_oldest, local_only or block, using local_only")
+    MODERATION_OVERFLOW = "local_only"
+
 CSS = os.getenv("CSS", "body{font-family:Arial,sans-serif;margin:0;padding:20px;background:#f5f5f5}.messages{display:flex;flex-direction:column;gap:10px}.message{display:flex;flex-direction:column;padding:10px;border-radius:5px;background:white;box-shadow:0 1px 3px rgba(0,0,0,0.1)}.message img{width:30px;height:30px;border-radius:50%;margin-right:10px}.author{font-weight:bold;margin-right:10px}.timestamp{color:#666;font-size:0.8em}.content{margin-top:5px}")
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-bot = commands.Bot(command_prefix=commands.when_mentioned_or("-"), intents=intents)
+
+
+class LuvoBot(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.transcript_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.started_at = time.monotonic()
+        self.ready_once = False
+        self.command_fingerprint_path = os.path.join(DATA_DIR, "command_tree.json")
+
+    def command_fingerprint(self, guild):
+        commands_payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda command: (command.get("type", 1), command["name"])
+        )
+        if guild:
+            commands_payload += sorted(
+                (command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+                key=lambda command: (command.get("type", 1), command["name"])
+            )
+        payload = {
+            "application": self.application_id,
+            "guild": guild.id if guild else None,
+            "commands": commands_payload
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    async def sync_commands(self, force=False):
+        guild = discord.Object(id=GUILD) if GUILD != 0 else None
+        fingerprint = self.command_fingerprint(guild)
+        try:
+            with open(self.command_fingerprint_path, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("fingerprint")
+        except (FileNotFoundError, ValueError):
+            previous = None
+        
+        if not force and previous == fingerprint:
+            print("Slash commands unchanged, skipping sync")
+            return False
+        
+        await self.tree.sync(guild=guild)
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(self.command_fingerprint_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint}, f)
+        print(f"Slash commands synced {'to guild' if guild else 'globally'}")
+        return True
+
+    async def start_transcript_pool(self):
+        if TRANSCRIPT_WORKERS <= 0:
+            return
+        self.transcript_pool = concurrent.futures.ProcessPoolExecutor(max_workers=TRANSCRIPT_WORKERS)
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(
+                loop.run_in_executor(self.transcript_pool, warm_worker) for _ in range(TRANSCRIPT_WORKERS)
+            ))
+            print(f"Transcript worker pool ready ({TRANSCRIPT_WORKERS} workers)")
+        except Exception as e:
+            print(f"Failed to start transcript workers, rendering in threads instead: {e}")
+            self.transcript_pool.shutdown(wait=False, cancel_futures=True)
+            self.transcript_pool = None
+
+    async def run_transcript_job(self, function, *args):
+        if self.transcript_pool:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.transcript_pool, function, *args)
+            except concurrent.futures.process.BrokenProcessPool:
+                print("Transcript worker pool crashed, restarting it")
+                self.transcript_pool.shutdown(wait=False, cancel_futures=True)
+                self.transcript_pool = None
+                asyncio.create_task(self.start_transcript_pool())
+        return await asyncio.to_thread(function, *args)
+
+    async def setup_hook(self):
+        shutil.rmtree(TRANSCRIPT_WORK_DIR, ignore_errors=True)
+        await self.start_transcript_pool()
+        if VERDICT_CACHE_SNAPSHOT:
+            verdict_cache.load()
+        answer_cache.load()
+        ticket_journal.open()
+        scheduler.load()
+        panel_registry.load()
+        transcript_index.open()
+        prune_transcript_index.start()
+        save_snapshots.start()
+        moderation_queue.start()
+
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+
+        self.add_view(PersistentView())
+        self.add_view(TicketView(None))
+        self.add_view(ConfirmCloseView(None))
+        print("Persistent views added")
+
+        try:
+            await self.sync_commands()
+        except Exception as e:
+            print(f"Failed to sync commands: {e}")
+        print(f"Setup finished in {time.monotonic() - self.started_at:.2f}s")
+
+    async def close(self):
+        await moderation_queue.drain()
+        save_snapshots.cancel()
+        if VERDICT_CACHE_SNAPSHOT:
+            verdict_cache.save()
+        answer_cache.save()
+        prune_transcript_index.cancel()
+        transcript_index.close()
+        if scheduler.task:
+            scheduler.task.cancel()
+        scheduler.save()
+        if self.transcript_pool:
+            self.transcript_pool.shutdown(wait=False, cancel_futures=True)
+        if self.session and not self.session.closed:
+            await self.session.close()
+        await super().close()
+
+
+bot = LuvoBot(command_prefix=commands.when_mentioned_or("-"), intents=intents)
 
 @bot.event
 async def on_app_command_error(interaction, error):
@@ -59,6 +265,69 @@ async def on_app_command_error(interaction, error):
     else:
         raise error
 
+async def create_ticket(interaction, prefix, ticket_embed, status_description):
+    timings = {}
+    started = step_started = time.perf_counter()
+    
+    def step(name):
+        nonlocal step_started
+        now = time.perf_counter()
+        timings[name] = (now - step_started) * 1000
+        step_started = now
+    
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    step("defer")
+    
+    guild = bot.get_guild(GUILD)
+    ticket_category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
+    if not ticket_category:
+        await interaction.followup.send(
+            "Error: Ticket category not found. Please contact server administrators.",
+            ephemeral=True
+        )
+        return None
+    
+    user = interaction.user
+    name = f"{prefix}〢{user.name.lower()}"
+    topic = f"Ticket owner: {user.id}"
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False, send_messages=False),
+        guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+        user: discord.PermissionOverwrite(view_channel=True, send_messages=True)
+    }
+    ticket_channel = None
+    if ticket_pool.task:
+        ticket_channel = await ticket_pool.claim(guild, name, topic, overwrites)
+        step("claim")
+    if ticket_channel is None:
+        ticket_channel = await guild.create_text_channel(name, category=ticket_category, topic=topic, overwrites=overwrites)
+        step("create")
+    open_tickets.add(ticket_channel, user.id)
+    
+    em = discord.Embed(
+        description=f"Your ticket has been created in {ticket_channel.mention}",
+        color=discord.Color.green()
+    )
+    await interaction.followup.send(embed=em, ephemeral=True)
+    step("reply")
+    
+    ticket_message = await ticket_channel.send(f"||@everyone|| {user.mention}", embed=ticket_embed, view=TicketView(ticket_channel))
+    step("send")
+    
+    com = discord.Embed(
+        title="<:check_yes:1351969576669151304> Request Submitted",
+        description=status_description,
+        color=discord.Color.green(),
+        timestamp=datetime.datetime.utcnow()
+    )
+    await asyncio.gather(ticket_message.pin(), ticket_channel.send(embed=com))
+    step("pin+status")
+    
+    total = (time.perf_counter() - started) * 1000
+    print(f"Ticket {ticket_channel.name} created in {total:.0f}ms (" + ", ".join(f"{name} {ms:.0f}ms" for name, ms in timings.items()) + ")")
+    return ticket_channel
+
+
 class Support(discord.ui.Modal, title="Support Ticket"):
     details = discord.ui.TextInput(
         label="Support Details",
@@ -69,16 +338,6 @@ class Support(discord.ui.Modal, title="Support Ticket"):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            guild = bot.get_guild(GUILD)
-            ticket_category = discord.utils.get(guild.categories, name="━━━| 🎫 TICKETS |━━━")
-            
-            if not ticket_category:
-                await interaction.response.send_message(
-                    "Error: Ticket category not found. Please contact server administrators.",
-                    ephemeral=True
-                )
-                return
-                
             user = interaction.user
             user_avatar_url = user.avatar.url if user.avatar else user.default_avatar.url
             
@@ -89,36 +348,8 @@ class Support(discord.ui.Modal, title="Support Ticket"):
                 timestamp=datetime.datetime.utcnow()
             )
             embed.set_thumbnail(url=user_avatar_url)
-
-            ticket_channel = await guild.create_text_channel(
-                f"❓〢{interaction.user.name.lower()}",
-                category=ticket_category
-            )
-            
-            await ticket_channel.set_permissions(guild.default_role,
-                                                view_channel=False,
-                                                read_messages=False,
-                                                send_messages=False)
-            await ticket_channel.set_permissions(interaction.user,
-                                                read_messages=True,
-                                                send_messages=True)
-            
-            em = discord.Embed(
-                description=f"Your ticket has been created in {ticket_channel.mention}",
-                color=discord.Color.green()
-            )
             
-            await interaction.response.send_message(embed=em, ephemeral=True)
-            damn = await ticket_channel.send(f"||@everyone|| {interaction.user.mention}", embed=embed, view=TicketView(ticket_channel))
-            await damn.pin()
-            
-            com = discord.Embed(
-                title="<:check_yes:1351969576669151304> Request Submitted",
-                description="Please wait while our team reviews your request.",
-                color=discord.Color.green(),
-                timestamp=datetime.datetime.utcnow()
-            )
-            await ticket_channel.send(embed=com)
+            await create_ticket(interaction, "❓", embed, "Please wait while our team reviews your request.")
         except Exception as e:
             print(f"Support modal error: {e}")
             try:
@@ -160,16 +391,6 @@ class MyModal(discord.ui.Modal, title="Placing Order"):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            guild = bot.get_guild(GUILD)
-            ticket_category = discord.utils.get(guild.categories, name="━━━| 🎫 TICKETS |━━━")
-            
-            if not ticket_category:
-                await interaction.response.send_message(
-                    "Error: Ticket category not found. Please contact server administrators.",
-                    ephemeral=True
-                )
-                return
-                
             user = interaction.user
             user_avatar_url = user.avatar.url if user.avatar else user.default_avatar.url
             
@@ -182,36 +403,13 @@ class MyModal(discord.ui.Modal, title="Placing Order"):
             embed.add_field(name="Budget", value=f"```{self.budget.value}```", inline=True)
             embed.add_field(name="Submitted by", value=f"```{interaction.user.name}```", inline=True)
             embed.set_thumbnail(url=user_avatar_url)
-
-            ticket_channel = await guild.create_text_channel(
-                f"🎫〢{interaction.user.name.lower()}",
-                category=ticket_category
-            )
-            
-            await ticket_channel.set_permissions(guild.default_role,
-                                                view_channel=False,
-                                                read_messages=False,
-                                                send_messages=False)
-            await ticket_channel.set_permissions(interaction.user,
-                                                read_messages=True,
-                                                send_messages=True)
-            
-            em = discord.Embed(
-                description=f"Your ticket has been created in {ticket_channel.mention}",
-                color=discord.Color.green()
-            )
-            
-            await interaction.response.send_message(embed=em, ephemeral=True)
-            damn = await ticket_channel.send(f"||@everyone|| {interaction.user.mention}", embed=embed, view=TicketView(ticket_channel))
-            await damn.pin()
             
-            com = discord.Embed(
-                title="<:check_yes:1351969576669151304> Request Submitted",
-                description="Please wait while our team reviews your request, Feel free to share more details about your project.",
-                color=discord.Color.green(),
-                timestamp=datetime.datetime.utcnow()
+            await create_ticket(
+                interaction,
+                "🎫",
+                embed,
+                "Please wait while our team reviews your request, Feel free to share more details about your project."
             )
-            await ticket_channel.send(embed=com)
         except Exception as e:
             print(f"Order modal error: {e}")
             try:
@@ -236,6 +434,761 @@ class MyModal(discord.ui.Modal, title="Placing Order"):
         )
 
 
+async def iter_history_pages(channel, page_size=100, after=None, before=None):
+    pages = asyncio.Queue(maxsize=TRANSCRIPT_PREFETCH_PAGES)
+    errors = []
+    
+    async def fetch_pages():
+        page = []
+        try:
+            async for message in channel.history(limit=None, after=after, before=before, oldest_first=True):
+                page.append(message)
+                if len(page) >= page_size:
+                    await pages.put(page)
+                    page = []
+            if page:
+                await pages.put(page)
+        except Exception as e:
+            errors.append(e)
+        await pages.put(None)
+    
+    fetcher = asyncio.create_task(fetch_pages())
+    try:
+        while True:
+            page = await pages.get()
+            if page is None:
+                break
+            yield page
+            await asyncio.sleep(0)
+        if errors:
+            raise errors[0]
+    finally:
+        fetcher.cancel()
+
+
+def is_ticket_channel(channel):
+    category = getattr(channel, "category", None)
+    return category is not None and category.name == TICKET_CATEGORY_NAME
+
+
+def journal_record(message):
+    return {
+        "op": "message",
+        "id": message.id,
+        "author": message.author.name,
+        "avatar": message.author.avatar.url if message.author.avatar else message.author.default_avatar.url,
+        "ts": message.created_at.timestamp(),
+        "content": message.content,
+        "embeds": [[embed.title, embed.description] for embed in message.embeds],
+        "attachments": [[attachment.filename, attachment.url] for attachment in message.attachments]
+    }
+
+
+class TicketJournal:
+    def __init__(self, directory):
+        self.directory = directory
+        self.gap_generation = 0
+        self.pending = {}
+        self.writer = None
+
+    def path(self, channel_id):
+        return os.path.join(self.directory, f"{channel_id}.ndjson")
+
+    def append(self, channel_id, *records):
+        self.pending.setdefault(channel_id, []).extend(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        if self.writer is None or self.writer.done():
+            self.writer = asyncio.create_task(self.write_pending())
+
+    async def write_pending(self):
+        while self.pending:
+            batch, self.pending = self.pending, {}
+            await asyncio.to_thread(self.write_batch, batch)
+
+    def write_batch(self, batch):
+        for channel_id, lines in batch.items():
+            try:
+                with open(self.path(channel_id), "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except Exception as e:
+                print(f"Failed to write ticket journal for {channel_id}: {e}")
+
+    async def flush(self):
+        if self.writer:
+            await asyncio.shield(self.writer)
+
+    def iter_records(self, channel_id):
+        try:
+            with open(self.path(channel_id), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        pass
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def gap_windows(records):
+        started = False
+        last_id = None
+        gap_start = None
+        in_gap = False
+        windows = []
+        for record in records:
+            op = record["op"]
+            if op == "start":
+                started = True
+            elif op == "message":
+                if in_gap and not record.get("backfill"):
+                    windows.append((gap_start, record["id"]))
+                    in_gap = False
+                if last_id is None or record["id"] > last_id:
+                    last_id = record["id"]
+            elif op == "gap" and not in_gap:
+                in_gap = True
+                gap_start = last_id
+            elif op == "synced":
+                windows.clear()
+                in_gap = False
+        if in_gap:
+            windows.append((gap_start, None))
+        return started, windows
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+    def journaled_channels(self):
+        channels = {int(filename[:-len(".ndjson")]) for filename in os.listdir(self.directory) if filename.endswith(".ndjson")}
+        return channels.union(self.pending)
+
+    def mark_gaps(self):
+        self.gap_generation += 1
+        for channel_id in self.journaled_channels():
+            self.append(channel_id, {"op": "gap"})
+
+    def start(self, channel_id):
+        self.append(channel_id, {"op": "start"})
+
+    async def backfill(self, channel, windows):
+        generation = self.gap_generation
+        for after_id, before_id in windows:
+            after = discord.Object(id=after_id) if after_id else None
+            before = discord.Object(id=before_id) if before_id else None
+            async for page in iter_history_pages(channel, after=after, before=before):
+                self.append(channel.id, *(dict(journal_record(message), backfill=True) for message in page))
+        if generation == self.gap_generation:
+            self.append(channel.id, {"op": "synced"})
+
+    async def catch_up(self, channel):
+        await self.flush()
+        started, windows = await asyncio.to_thread(self.gap_windows, self.iter_records(channel.id))
+        if not started:
+            self.append(channel.id, {"op": "start"})
+            windows = [(None, None)]
+        if windows:
+            await self.backfill(channel, windows)
+
+    async def resume(self, guild):
+        for channel_id in self.journaled_channels():
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                await self.discard(channel_id)
+                continue
+            try:
+                await self.catch_up(channel)
+            except Exception as e:
+                print(f"Failed to backfill ticket journal for {channel_id}: {e}")
+
+    async def collect(self, channel):
+        await self.catch_up(channel)
+        await self.flush()
+        path = self.path(channel.id)
+        try:
+            return path, os.path.getsize(path)
+        except FileNotFoundError:
+            return path, 0
+
+    async def discard(self, channel_id):
+        self.pending.pop(channel_id, None)
+        await self.flush()
+        try:
+            await asyncio.to_thread(os.remove, self.path(channel_id))
+        except FileNotFoundError:
+            pass
+
+
+ticket_journal = TicketJournal(os.path.join(DATA_DIR, "journal"))
+
+
+TICKET_OWNER_RE = re.compile(r"Ticket owner: (\d+)")
+MAX_OPEN_TICKETS = 2
+
+
+class OpenTickets:
+    def __init__(self):
+        self.by_owner = {}
+        self.owners = {}
+
+    @staticmethod
+    def owner_of(channel):
+        match = TICKET_OWNER_RE.search(getattr(channel, "topic", None) or "")
+        if match:
+            return int(match.group(1))
+        for target, overwrite in channel.overwrites.items():
+            if isinstance(target, discord.Member) and not target.bot and overwrite.read_messages:
+                return target.id
+            if isinstance(target, discord.Object) and target.type is discord.User and overwrite.read_messages:
+                return target.id
+        return None
+
+    def add(self, channel, owner_id=None):
+        owner_id = owner_id or self.owner_of(channel)
+        if owner_id is None:
+            return
+        self.remove(channel.id)
+        self.owners[channel.id] = owner_id
+        self.by_owner.setdefault(owner_id, set()).add(channel.id)
+
+    def remove(self, channel_id):
+        owner_id = self.owners.pop(channel_id, None)
+        if owner_id is None:
+            return
+        channels = self.by_owner.get(owner_id)
+        if channels:
+            channels.discard(channel_id)
+            if not channels:
+                del self.by_owner[owner_id]
+
+    def build(self, guild):
+        self.by_owner.clear()
+        self.owners.clear()
+        for channel in guild.text_channels:
+            if is_ticket_channel(channel):
+                self.add(channel)
+        print(f"Indexed {len(self.owners)} open tickets for {len(self.by_owner)} users")
+
+    def tickets(self, user_id):
+        return sorted(self.by_owner.get(user_id, ()))
+
+    def count(self, user_id):
+        return len(self.by_owner.get(user_id, ()))
+
+
+open_tickets = OpenTickets()
+
+
+TICKET_POOL_TOPIC = "Ticket pool: available"
+
+
+class TicketPool:
+    def __init__(self, size, low_water, interval):
+        self.size = size
+        self.low_water = min(low_water, size - 1) if size else 0
+        self.interval = interval
+        self.available = deque()
+        self.refill = None
+        self.task = None
+        self.claims = 0
+        self.misses = 0
+        self.created = 0
+        self.claim_latencies = deque(maxlen=100)
+        self.last_error = None
+
+    def start(self, guild):
+        if not self.size or self.task:
+            return
+        ticket_category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
+        if ticket_category:
+            self.available.extend(
+                channel.id for channel in ticket_category.text_channels if channel.topic == TICKET_POOL_TOPIC
+            )
+        print(f"Ticket pool: {len(self.available)}/{self.size} channels ready")
+        self.refill = asyncio.Event()
+        self.refill.set()
+        self.task = asyncio.create_task(self.replenish(guild))
+
+    async def replenish(self, guild):
+        while True:
+            await self.refill.wait()
+            self.refill.clear()
+            while len(self.available) < self.size:
+                ticket_category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
+                if not ticket_category:
+                    break
+                try:
+                    channel = await guild.create_text_channel(
+                        "pool〢ticket",
+                        category=ticket_category,
+                        topic=TICKET_POOL_TOPIC,
+                        overwrites={
+                            guild.default_role: discord.PermissionOverwrite(view_channel=False, send_messages=False),
+                            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
+                        }
+                    )
+                    self.available.append(channel.id)
+                    self.created += 1
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"Failed to replenish ticket pool: {e}")
+                await asyncio.sleep(self.interval)
+
+    async def claim(self, guild, name, topic, overwrites):
+        started = time.perf_counter()
+        while self.available:
+            channel = guild.get_channel(self.available.popleft())
+            if channel is None:
+                continue
+            try:
+                await channel.edit(name=name, topic=topic, overwrites=overwrites)
+            except discord.NotFound:
+                continue
+            except Exception as e:
+                self.available.appendleft(channel.id)
+                self.last_error = str(e)
+                print(f"Failed to claim pooled ticket channel: {e}")
+                break
+            finally:
+                if len(self.available) <= self.low_water:
+                    self.refill.set()
+            self.claims += 1
+            self.claim_latencies.append((time.perf_counter() - started) * 1000)
+            return channel
+        self.misses += 1
+        return None
+
+    def percentile(self, percentile):
+        if not self.claim_latencies:
+            return None
+        ordered = sorted(self.claim_latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+ticket_pool = TicketPool(TICKET_POOL_SIZE, TICKET_POOL_LOW_WATER, TICKET_POOL_REPLENISH_INTERVAL)
+
+
+BULK_DELETE_MAX_AGE = 14 * 24 * 60 * 60 - 60
+
+
+class ActionScheduler:
+    def __init__(self, path, max_attempts=3, retry_delay=60):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.heap = []
+        self.sequence = 0
+        self.wakeup = None
+        self.task = None
+        self.dirty = False
+        self.executed = 0
+        self.failed = 0
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                actions = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Failed to load scheduled actions: {e}")
+            return
+        for due, kind, channel_id, target_id, attempts in actions:
+            self.push(due, kind, channel_id, target_id, attempts)
+        print(f"Loaded {len(self.heap)} scheduled actions")
+
+    def save(self, actions=None):
+        actions = list(self.heap) if actions is None else actions
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump([[due, kind, channel_id, target_id, attempts] for due, _, kind, channel_id, target_id, attempts in actions], f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Failed to save scheduled actions: {e}")
+
+    def push(self, due, kind, channel_id, target_id=None, attempts=0):
+        self.sequence += 1
+        heapq.heappush(self.heap, (due, self.sequence, kind, channel_id, target_id, attempts))
+        self.dirty = True
+        if self.wakeup:
+            self.wakeup.set()
+
+    def delete_message_later(self, message, delay):
+        self.push(time.time() + delay, "delete_message", message.channel.id, message.id)
+
+    def delete_channel_later(self, channel, delay):
+        self.push(time.time() + delay, "delete_channel", channel.id)
+
+    def start(self):
+        if self.task:
+            return
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
+        self.task.add_done_callback(self.on_task_done)
+
+    def on_task_done(self, task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"Scheduler task crashed, restarting in 5s: {error}")
+            self.task = None
+            asyncio.get_running_loop().call_later(5, self.start)
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Scheduler error: {e}")
+                await asyncio.sleep(5)
+
+    async def run_once(self):
+        if self.dirty:
+            self.dirty = False
+            await asyncio.to_thread(self.save, list(self.heap))
+        self.wakeup.clear()
+        timeout = self.heap[0][0] - time.time() if self.heap else None
+        if timeout is None or timeout > 0:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return
+        
+        due_actions = []
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            due_actions.append(heapq.heappop(self.heap))
+        self.dirty = True
+        
+        message_deletes = {}
+        for action in due_actions:
+            if action[2] == "delete_message":
+                message_deletes.setdefault(action[3], []).append(action)
+        groups = [(actions, self.delete_messages(channel_id, actions)) for channel_id, actions in message_deletes.items()]
+        groups += [([action], self.execute(action)) for action in due_actions if action[2] == "delete_channel"]
+        results = await asyncio.gather(*(job for _, job in groups), return_exceptions=True)
+        for (actions, _), result in zip(groups, results):
+            if isinstance(result, Exception):
+                for action in actions:
+                    self.retry(action, result)
+
+    def retry(self, action, error):
+        due, _, kind, channel_id, target_id, attempts = action
+        if attempts + 1 < self.max_attempts:
+            self.push(time.time() + self.retry_delay * (attempts + 1), kind, channel_id, target_id, attempts + 1)
+        else:
+            self.failed += 1
+            print(f"Giving up on scheduled {kind} for {target_id or channel_id}: {error}")
+
+    async def delete_messages(self, channel_id, actions):
+        channel = bot.get_channel(channel_id)
+        bulk = [] if channel is None else [
+            action for action in actions
+            if time.time() - discord.utils.snowflake_time(action[4]).timestamp() < BULK_DELETE_MAX_AGE
+        ]
+        if len(bulk) >= 2:
+            for start in range(0, len(bulk), 100):
+                chunk = bulk[start:start + 100]
+                try:
+                    await channel.delete_messages([discord.Object(id=action[4]) for action in chunk])
+                    self.executed += len(chunk)
+                except discord.NotFound:
+                    self.executed += len(chunk)
+                except discord.Forbidden as e:
+                    self.failed += len(chunk)
+                    print(f"Missing permissions for scheduled deletions in {channel_id}: {e}")
+                except Exception as e:
+                    for action in chunk:
+                        self.retry(action, e)
+            actions = [action for action in actions if action not in bulk]
+        for action in actions:
+            await self.execute(action)
+
+    async def execute(self, action):
+        kind, channel_id, target_id = action[2], action[3], action[4]
+        try:
+            if kind == "delete_message":
+                await bot.get_partial_messageable(channel_id).get_partial_message(target_id).delete()
+            elif kind == "delete_channel":
+                channel = bot.get_channel(channel_id)
+                if channel is not None:
+                    await channel.delete()
+            self.executed += 1
+        except discord.NotFound:
+            self.executed += 1
+        except discord.Forbidden as e:
+            self.failed += 1
+            print(f"Missing permissions for scheduled {kind} in {channel_id}: {e}")
+        except Exception as e:
+            self.retry(action, e)
+
+
+scheduler = ActionScheduler(os.path.join(DATA_DIR, "scheduled.json"))
+
+
+class TranscriptIndex:
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS tickets (
+                id INTEGER PRIMARY KEY,
+                channel_id INTEGER,
+                name TEXT,
+                creator TEXT,
+                closer TEXT,
+                opened_at REAL,
+                closed_at REAL,
+                message_count INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS tickets_closed_at ON tickets(closed_at);
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY,
+                ticket_id INTEGER,
+                author TEXT,
+                ts REAL,
+                body BLOB
+            );
+            CREATE INDEX IF NOT EXISTS messages_ticket_id ON messages(ticket_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(text, author, ticket, content='');
+        """)
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    @staticmethod
+    def message_text(message):
+        return "\n".join([message.content] + [
+            f"{title or ''} {description or ''}".strip() for title, description in message.embeds
+        ]).strip()
+
+    def add(self, transcript, channel_id, closed_at):
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO tickets (channel_id, name, creator, closer, opened_at, closed_at, message_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    channel_id,
+                    transcript.channel_name,
+                    transcript.creator_name,
+                    transcript.closed_by,
+                    closed_at,
+                    closed_at,
+                    transcript.message_count
+                )
+            )
+            ticket_id = cursor.lastrowid
+            ticket_terms = f"{transcript.channel_name} {transcript.creator_name} {transcript.closed_by}"
+            opened_at = None
+            for message in transcript.iter_messages():
+                if opened_at is None:
+                    opened_at = message.timestamp
+                    self.connection.execute("UPDATE tickets SET opened_at = ? WHERE id = ?", (opened_at, ticket_id))
+                text = self.message_text(message)
+                if not text:
+                    continue
+                author = transcript.authors[message.author].name
+                cursor = self.connection.execute(
+                    "INSERT INTO messages (ticket_id, author, ts, body) VALUES (?, ?, ?, ?)",
+                    (ticket_id, author, message.timestamp, zlib.compress(text.encode("utf-8")))
+                )
+                self.connection.execute(
+                    "INSERT INTO messages_fts (rowid, text, author, ticket) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, text, author, ticket_terms)
+                )
+
+    def prune(self, retention_days):
+        cutoff = time.time() - retention_days * 24 * 60 * 60
+        with self.lock, self.connection:
+            expired = self.connection.execute(
+                "SELECT id, name, creator, closer FROM tickets WHERE closed_at < ?", (cutoff,)
+            ).fetchall()
+            for ticket_id, name, creator, closer in expired:
+                ticket_terms = f"{name} {creator} {closer}"
+                for message_id, author, body in self.connection.execute(
+                    "SELECT id, author, body FROM messages WHERE ticket_id = ?", (ticket_id,)
+                ).fetchall():
+                    self.connection.execute(
+                        "INSERT INTO messages_fts (messages_fts, rowid, text, author, ticket) VALUES ('delete', ?, ?, ?, ?)",
+                        (message_id, zlib.decompress(body).decode("utf-8"), author, ticket_terms)
+                    )
+                self.connection.execute("DELETE FROM messages WHERE ticket_id = ?", (ticket_id,))
+                self.connection.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+        if expired:
+            print(f"Pruned {len(expired)} tickets from the transcript index")
+        return len(expired)
+
+    @staticmethod
+    def snippet(text, terms, width=80):
+        lowered = text.lower()
+        positions = [lowered.find(term) for term in terms if lowered.find(term) != -1]
+        start = max(0, min(positions) - width // 2) if positions else 0
+        excerpt = text[start:start + width].replace("\n", " ")
+        for term in terms:
+            excerpt = re.sub(re.escape(term), lambda match: f"**{match.group(0)}**", excerpt, flags=re.IGNORECASE)
+        return f"{'…' if start else ''}{excerpt}{'…' if start + width < len(text) else ''}"
+
+    def search(self, query, limit=10):
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        with self.lock:
+            rows = self.connection.execute(
+                """
+                SELECT tickets.name, tickets.creator, tickets.closer, tickets.closed_at, messages.author, messages.ts, messages.body
+                FROM (SELECT rowid, rank FROM messages_fts WHERE messages_fts MATCH ? ORDER BY rank LIMIT ?) AS hits
+                JOIN messages ON messages.id = hits.rowid
+                JOIN tickets ON tickets.id = messages.ticket_id
+                ORDER BY hits.rank
+                """,
+                (match, limit)
+            ).fetchall()
+        return [
+            (name, creator, closer, closed_at, author, ts, self.snippet(zlib.decompress(body).decode("utf-8"), terms))
+            for name, creator, closer, closed_at, author, ts, body in rows
+        ]
+
+
+transcript_index = TranscriptIndex(os.path.join(DATA_DIR, "transcripts.db"))
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class ArchivedAttachment:
+    __slots__ = ("message_id", "filename", "url", "file", "size", "sha256", "path", "error")
+
+    def __init__(self, message_id, filename, url):
+        self.message_id = message_id
+        self.filename = filename
+        self.url = url
+        self.file = None
+        self.size = 0
+        self.sha256 = None
+        self.path = None
+        self.error = None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def transcript_attachments(transcript):
+    attachments = []
+    seen_urls = set()
+    for message in transcript.iter_messages():
+        for filename, url in message.attachments:
+            if url not in seen_urls:
+                seen_urls.add(url)
+                attachments.append(ArchivedAttachment(message.id, filename, url))
+    return attachments
+
+
+async def download_attachments(attachments, size_limit, progress=None):
+    semaphore = asyncio.Semaphore(ATTACHMENT_DOWNLOAD_CONCURRENCY)
+    budget = ATTACHMENT_ARCHIVE_MAX_MB * 1024 * 1024
+    state = {"done": 0, "bytes": 0}
+    
+    async def download(attachment):
+        async with semaphore:
+            file = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                async with bot.session.get(attachment.url, timeout=aiohttp.ClientTimeout(total=120)) as response:
+                    response.raise_for_status()
+                    if (response.content_length or 0) > min(size_limit, budget - state["bytes"]):
+                        raise ValueError("too large to archive")
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        size += len(chunk)
+                        state["bytes"] += len(chunk)
+                        if size > size_limit or state["bytes"] > budget:
+                            raise ValueError("too large to archive")
+                        digest.update(chunk)
+                        file.write(chunk)
+                attachment.file = file
+                attachment.size = size
+                attachment.sha256 = digest.hexdigest()
+            except Exception as e:
+                file.close()
+                state["bytes"] -= size
+                attachment.error = str(e) or type(e).__name__
+        state["done"] += 1
+        if progress:
+            await progress(state["done"], len(attachments), state["bytes"])
+    
+    await asyncio.gather(*(download(attachment) for attachment in attachments))
+    
+    paths = {}
+    for attachment in attachments:
+        if not attachment.file:
+            continue
+        if attachment.sha256 in paths:
+            attachment.path = paths[attachment.sha256]
+            attachment.close()
+            continue
+        safe_name = re.sub(r"[^\w.-]", "_", attachment.filename)[-100:] or "file"
+        attachment.path = f"attachments/{attachment.sha256[:12]}-{safe_name}"
+        paths[attachment.sha256] = attachment.path
+    return attachments
+
+
+def make_work_dir():
+    os.makedirs(TRANSCRIPT_WORK_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix="close-", dir=TRANSCRIPT_WORK_DIR)
+
+
+def build_ticket_archive(transcript_paths, attachments, max_part_size, directory):
+    archive = TranscriptArchive(max_part_size=max_part_size, directory=directory)
+    
+    for part_number, transcript_path in enumerate(transcript_paths, start=1):
+        name = f"transcript-part{part_number}.html" if len(transcript_paths) > 1 else "transcript.html"
+        with open(transcript_path, "rb") as transcript_file:
+            archive.add(name, transcript_file, os.path.getsize(transcript_path), compress=True)
+        os.remove(transcript_path)
+    
+    for attachment in attachments:
+        if attachment.file:
+            with attachment.file:
+                archive.add(attachment.path, attachment.file, attachment.size)
+            attachment.file = None
+    
+    manifest = json.dumps([{
+        "message": attachment.message_id,
+        "filename": attachment.filename,
+        "url": attachment.url,
+        "path": attachment.path,
+        "sha256": attachment.sha256,
+        "size": attachment.size,
+        "error": attachment.error
+    } for attachment in attachments], indent=2, ensure_ascii=False).encode("utf-8")
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as manifest_file:
+        manifest_file.write(manifest)
+        archive.add("manifest.json", manifest_file, len(manifest), compress=True)
+    
+    paths = []
+    for part in archive.finish():
+        part.close()
+        paths.append(part.name)
+    return paths
+
+
 class TicketView(discord.ui.View):
     def __init__(self, ticket_channel):
         super().__init__(timeout=None)
@@ -285,126 +1238,115 @@ class ConfirmCloseView(discord.ui.View):
                 
             log_channel = bot.get_channel(LOG_CHANNEL)
             if log_channel:
-                messages = []
-                async for message in channel.history(limit=500, oldest_first=True):
-                    messages.append(message)
-
-                text_preview = f"# Transcript for {channel.name}\n"
-                text_preview += f"Closed by: {interaction.user.name} ({interaction.user.id}) at <t:{int(datetime.datetime.utcnow().timestamp())}:F>\n\n"
-                
                 ticket_creator_name = channel.name.split('〢')[-1] if '〢' in channel.name else "Unknown"
-                text_preview += f"Ticket created by: {ticket_creator_name}\n"
-                text_preview += f"Total messages: {len(messages)}\n\n"
-                
-                text_preview += "## Message Summary\n"
+                closed_at = datetime.datetime.utcnow()
                 
-                message_limit = min(15, len(messages))
-                if len(messages) <= message_limit:
-                    preview_messages = messages
-                else:
-                    preview_messages = messages[:5] + messages[-10:]
-                    text_preview += f"*Showing {message_limit} out of {len(messages)} messages*\n\n"
-                
-                for msg in preview_messages:
-                    timestamp = f"<t:{int(msg.created_at.timestamp())}:t>"
-                    text_preview += f"**{msg.author.name}** ({timestamp}): {msg.content[:100]}{'...' if len(msg.content) > 100 else ''}\n"
-                
-                transcript = ""
-                
-                enhanced_css = """
-                body { font-family: 'Segoe UI', Arial, sans-serif; margin: 0; padding: 20px; background: #f9f9f9; color: #333; }
-                .ticket-info { background: #4A76A8; color: white; padding: 15px; border-radius: 8px; margin-bottom: 20px; }
-                .ticket-title { font-size: 22px; margin: 0; }
-                .ticket-meta { font-size: 14px; opacity: 0.8; margin-top: 5px; }
-                .messages { display: flex; flex-direction: column; gap: 15px; }
-                .message { display: flex; background: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); overflow: hidden; }
-                .message-avatar { width: 50px; padding: 15px; }
-                .message-avatar img { width: 50px; height: 50px; border-radius: 50%; }
-                .message-content { flex: 1; padding: 15px 15px 15px 0; }
-                .message-header { display: flex; align-items: center; margin-bottom: 5px; }
-                .message-author { font-weight: bold; margin-right: 8px; }
-                .message-timestamp { color: #888; font-size: 12px; }
-                .message-text { margin-top: 5px; white-space: pre-wrap; }
-                .message-attachments { margin-top: 10px; }
-                .message-attachments a { display: inline-block; margin-right: 10px; color: #4A76A8; text-decoration: none; }
-                .system-message { background: #f0f7ff; border-left: 4px solid #4A76A8; padding: 10px; margin: 5px 0; }
-                """
-                
-                transcript += f"""<!DOCTYPE html>
-                <html>
-                <head>
-                    <meta charset="UTF-8">
-                    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                    <title>Ticket Transcript - {channel.name}</title>
-                    <style>{enhanced_css}</style>
-                </head>
-                <body>
-                    <div class="ticket-info">
-                        <h1 class="ticket-title">Ticket: {channel.name}</h1>
-                        <div class="ticket-meta">
-                            <div>Created by: {ticket_creator_name}</div>
-                            <div>Closed by: {interaction.user.name} on {datetime.datetime.utcnow().strftime('%Y-%m-%d at %H:%M:%S UTC')}</div>
-                            <div>Total Messages: {len(messages)}</div>
-                        </div>
-                    </div>
-                    <div class="messages">
-                """
+                journal_path, journal_size = await ticket_journal.collect(channel)
+                transcript_source = (
+                    journal_path,
+                    journal_size,
+                    channel.name,
+                    ticket_creator_name,
+                    interaction.user.name,
+                    closed_at.strftime('%Y-%m-%d at %H:%M:%S UTC')
+                )
+                transcript = await asyncio.to_thread(JournalTranscript, *transcript_source)
+                upload_limit = max(1024 * 1024, channel.guild.filesize_limit - TRANSCRIPT_UPLOAD_MARGIN)
+                message_count = transcript.message_count
                 
-                for message in messages:
-                    author_name = message.author.name
-                    author_avatar = message.author.avatar.url if message.author.avatar else message.author.default_avatar.url
-                    message_content = message.content.replace('<', '&lt;').replace('>', '&gt;')
-                    timestamp = message.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    embeds_html = ""
-                    if message.embeds:
-                        for embed in message.embeds:
-                            embeds_html += f'<div class="system-message">'
-                            if embed.title:
-                                embeds_html += f'<strong>{embed.title}</strong><br>'
-                            if embed.description:
-                                embeds_html += f'{embed.description}<br>'
-                            embeds_html += '</div>'
+                attachments = await asyncio.to_thread(transcript_attachments, transcript) if ATTACHMENT_ARCHIVE else []
+                if attachments:
+                    progress_message = await channel.send(embed=discord.Embed(
+                        title="📦 Archiving Attachments",
+                        description="Downloading attachments before the ticket is closed...",
+                        color=discord.Color.blue()
+                    ))
+                    last_progress = 0
                     
-                    attachments_html = ""
-                    if message.attachments:
-                        attachments_html = '<div class="message-attachments">'
-                        for attachment in message.attachments:
-                            attachments_html += f'<a href="{attachment.url}" target="_blank">{attachment.filename}</a> '
-                        attachments_html += '</div>'
+                    async def report_progress(done, total, downloaded):
+                        nonlocal last_progress
+                        if done < total and time.monotonic() - last_progress < ATTACHMENT_PROGRESS_INTERVAL:
+                            return
+                        last_progress = time.monotonic()
+                        try:
+                            await progress_message.edit(embed=discord.Embed(
+                                title="📦 Archiving Attachments",
+                                description=f"Downloaded **{done}/{total}** attachments ({format_bytes(downloaded)})",
+                                color=discord.Color.green() if done == total else discord.Color.blue()
+                            ))
+                        except discord.HTTPException:
+                            pass
                     
-                    transcript += f"""
-                    <div class="message">
-                        <div class="message-avatar">
-                            <img src="{author_avatar}" alt="{author_name}"/>
-                        </div>
-                        <div class="message-content">
-                            <div class="message-header">
-                                <span class="message-author">{author_name}</span>
-                                <span class="message-timestamp">{timestamp}</span>
-                            </div>
-                            <div class="message-text">{message_content}</div>
-                            {embeds_html}
-                            {attachments_html}
-                        </div>
-                    </div>
-                    """
+                    attachments = await download_attachments(attachments, upload_limit, progress=report_progress)
                 
-                transcript += "</div></body></html>"
+                work_dir = await asyncio.to_thread(make_work_dir)
+                try:
+                    try:
+                        if attachments:
+                            links = {attachment.url: attachment.path for attachment in attachments if attachment.path}
+                            rendered_paths = await bot.run_transcript_job(render_transcript, transcript_source, work_dir, False, upload_limit, links)
+                            transcript_paths = await asyncio.to_thread(build_ticket_archive, rendered_paths, attachments, upload_limit, work_dir)
+                        else:
+                            transcript_paths = await bot.run_transcript_job(render_transcript, transcript_source, work_dir, TRANSCRIPT_COMPRESS, upload_limit)
+                    finally:
+                        for attachment in attachments:
+                            attachment.close()
+                    
+                    try:
+                        await asyncio.to_thread(transcript_index.add, transcript, channel.id, closed_at.timestamp())
+                    except Exception as e:
+                        print(f"Failed to index transcript for {channel.name}: {e}")
 
-                preview_embed = discord.Embed(
-                    title=f"📝 Ticket Transcript Preview - {channel.name}",
-                    description=text_preview[:4000] if len(text_preview) > 4000 else text_preview,
-                    color=discord.Color.blue(),
-                    timestamp=datetime.datetime.utcnow()
-                )
-                preview_embed.set_footer(text="Full HTML transcript attached below")
-                await log_channel.send(embed=preview_embed)
-                
-                with io.StringIO(transcript) as transcript_file:
-                    await log_channel.send(
-                        file=discord.File(transcript_file, filename=f"transcript-{channel.name}-{datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S')}.html")
+                    text_preview = f"# Transcript for {channel.name}\n"
+                    text_preview += f"Closed by: {interaction.user.name} ({interaction.user.id}) at <t:{int(closed_at.timestamp())}:F>\n\n"
+                    
+                    text_preview += f"Ticket created by: {ticket_creator_name}\n"
+                    text_preview += f"Total messages: {message_count}\n\n"
+                    
+                    text_preview += "## Message Summary\n"
+                    
+                    if message_count > 15:
+                        text_preview += f"*Showing 15 out of {message_count} messages*\n\n"
+                    
+                    preview_messages = await asyncio.to_thread(transcript.preview, 5, 10)
+                    for msg in preview_messages:
+                        timestamp = f"<t:{int(msg.timestamp)}:t>"
+                        text_preview += f"**{transcript.authors[msg.author].name}** ({timestamp}): {msg.content[:100]}{'...' if len(msg.content) > 100 else ''}\n"
+
+                    preview_embed = discord.Embed(
+                        title=f"📝 Ticket Transcript Preview - {channel.name}",
+                        description=text_preview[:4000] if len(text_preview) > 4000 else text_preview,
+                        color=discord.Color.blue(),
+                        timestamp=datetime.datetime.utcnow()
                     )
+                    if attachments:
+                        archived = [attachment for attachment in attachments if attachment.path]
+                        archived_bytes = sum(attachment.size for attachment in archived)
+                        footer_text = f"Transcript and {len(archived)}/{len(attachments)} attachments ({format_bytes(archived_bytes)}) archived below"
+                    else:
+                        footer_text = "Full HTML transcript attached below"
+                    if len(transcript_paths) > 1:
+                        footer_text += f" in {len(transcript_paths)} parts"
+                    preview_embed.set_footer(text=footer_text)
+                    await log_channel.send(embed=preview_embed)
+                    
+                    file_prefix = f"transcript-{channel.name}-{closed_at.strftime('%Y%m%d%H%M%S')}"
+                    file_suffix = ".gz" if TRANSCRIPT_COMPRESS else ""
+                    file_extension = ".zip" if attachments else f".html{file_suffix}"
+                    for part_number, transcript_path in enumerate(transcript_paths, start=1):
+                        part_suffix = f"-part{part_number}" if len(transcript_paths) > 1 else ""
+                        await log_channel.send(
+                            file=discord.File(transcript_path, filename=f"{file_prefix}{part_suffix}{file_extension}")
+                        )
+                    
+                    if TRANSCRIPT_JSON_EXPORT:
+                        export_path = await bot.run_transcript_job(export_transcript, transcript_source, work_dir, TRANSCRIPT_COMPRESS)
+                        if os.path.getsize(export_path) <= upload_limit:
+                            await log_channel.send(file=discord.File(export_path, filename=f"{file_prefix}.ndjson{file_suffix}"))
+                        else:
+                            print(f"Skipping JSON export for {channel.name}: larger than the upload limit")
+                finally:
+                    await asyncio.to_thread(shutil.rmtree, work_dir, True)
             
             closing_embed = discord.Embed(
                 title="<a:alert:1351969965233934466> Ticket Closing",
@@ -414,9 +1356,7 @@ class ConfirmCloseView(discord.ui.View):
             )
             await channel.send(embed=closing_embed)
             
-            await asyncio.sleep(3)
-            
-            await channel.delete()
+            scheduler.delete_channel_later(channel, 3)
             
         except Exception as e:
             error_embed = discord.Embed(
@@ -459,7 +1399,7 @@ class PersistentView(discord.ui.View):
     )
     async def ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild = bot.get_guild(GUILD)
-        ticket_category = discord.utils.get(guild.categories, name="━━━| 🎫 TICKETS |━━━")
+        ticket_category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
         
         if not ticket_category:
             await interaction.response.send_message(
@@ -472,14 +1412,9 @@ class PersistentView(discord.ui.View):
             await interaction.response.send_modal(MyModal())
             return
             
-        user_tickets = [
-            channel for channel in ticket_category.channels 
-            if channel.name.endswith(f"{interaction.user.name.lower()}")
-        ]
-        
-        if len(user_tickets) >= 2:
+        if open_tickets.count(interaction.user.id) >= MAX_OPEN_TICKETS:
             await interaction.response.send_message(
-                "You already have 2 open tickets. Please close one before creating a new ticket.",
+                f"You already have {MAX_OPEN_TICKETS} open tickets. Please close one before creating a new ticket.",
                 ephemeral=True
             )
             return
@@ -493,7 +1428,7 @@ class PersistentView(discord.ui.View):
     )
     async def support(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild = bot.get_guild(GUILD)
-        ticket_category = discord.utils.get(guild.categories, name="━━━| 🎫 TICKETS |━━━")
+        ticket_category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
         
         if not ticket_category:
             await interaction.response.send_message(
@@ -506,14 +1441,9 @@ class PersistentView(discord.ui.View):
             await interaction.response.send_modal(Support())
             return
             
-        user_tickets = [
-            channel for channel in ticket_category.channels 
-            if channel.name.endswith(f"{interaction.user.name.lower()}")
-        ]
-        
-        if len(user_tickets) >= 2:
+        if open_tickets.count(interaction.user.id) >= MAX_OPEN_TICKETS:
             await interaction.response.send_message(
-                "You already have 2 open tickets. Please close one before creating a new ticket.",
+                f"You already have {MAX_OPEN_TICKETS} open tickets. Please close one before creating a new ticket.",
                 ephemeral=True
             )
             return
@@ -521,9 +1451,7 @@ class PersistentView(discord.ui.View):
             await interaction.response.send_modal(Support())
 
 
-@bot.command(name="send")
-@commands.has_permissions(administrator=True)
-async def setup(ctx):
+def build_ticket_panel_embeds():
     embed = discord.Embed(
         title="🎟️ Tickets",
         description=(
@@ -539,12 +1467,10 @@ async def setup(ctx):
     embed.set_footer(text="LuvoWeb • The Future of Freelance", icon_url=ICON_URL)
     embed.set_image(url="https://i.imgur.com/RTh8LFv.png")
     embed.set_thumbnail(url=ICON_URL)
-
-    await ctx.channel.send(embed=embed, view=PersistentView())
+    return [embed]
 
 
-@bot.command(name="embed")
-async def about_command(ctx):
+def build_about_embeds():
     embed1 = discord.Embed(color=discord.Color.from_rgb(48, 44, 52))
     embed1.set_image(url="https://i.imgur.com/h7zJWq5.png")
     
@@ -572,7 +1498,10 @@ async def about_command(ctx):
     
     embed2.set_thumbnail(url=ICON_URL)
     embed2.set_footer(text="LuvoWeb • The Future of Freelance", icon_url=ICON_URL)
-    
+    return [embed1, embed2]
+
+
+def about_view():
     view = discord.ui.View()
     view.add_item(discord.ui.Button(
         label="Order Now", 
@@ -587,235 +1516,688 @@ async def about_command(ctx):
         label="Website", 
         url="https://luvoweb.com"
     ))
-
-    await ctx.send(embeds=[embed1, embed2], view=view)
+    return view
+
+
+RULE_SECTIONS = [
+    (
+        "RULE 1 - Do Not Spam",
+        "Avoid sending repetitive messages, excessive emojis, or flooding channels with content. This includes project requests, portfolio shares, or technical questions. Use the appropriate channels for your inquiries and limit your messages to maintain a clean, professional environment."
+    ),
+    (
+        "RULE 2 - No Discrimination",
+        "Our agency values diversity and inclusion. Any form of racism, sexism, homophobia, or discriminatory behavior against clients, team members, or community participants will not be tolerated. Treat everyone with respect regardless of their technical experience, background, or business size."
+    ),
+    (
+        "RULE 3 - No Harassment or Bullying",
+        "Criticism of work should be constructive and professional. Do not belittle others' technical skills, design choices, or business decisions. We foster a supportive environment for learning and collaboration, not competition or negativity."
+    ),
+    (
+        "RULE 4 - No NSFW Content",
+        "Keep all content work-appropriate. This is a professional server for web development services. Do not share, request, or discuss explicit material, even in the context of website projects. We maintain a professional image and environment at all times."
+    ),
+    (
+        "RULE 5 - No Unauthorized Selling",
+        "Do not offer competing services or sell products within our community. Only LuvoWeb team members may offer development services here. Clients should not be solicited by other developers in any channel or via DM. Violations will result in immediate removal."
+    ),
+    (
+        "RULE 6 - No Illegal Activities",
+        "Do not request or offer services for illegal websites or applications (phishing, scamming, copyright infringement, etc.). All projects must comply with relevant laws and regulations. We will not participate in or facilitate illegal activities, including software piracy or unauthorized access systems."
+    ),
+    (
+        "RULE 7 - No DM Advertising",
+        "Do not send unsolicited messages to members offering services, requesting work, or promoting external businesses. All inquiries must go through proper channels. Respect others' privacy and our professional environment. Direct message advertising will result in immediate action."
+    ),
+    (
+        "RULE 8 - Respect Staff Authority",
+        "Our staff makes final decisions regarding projects, timelines, and pricing. Do not argue with staff about estimates, deadlines, or technical approaches in public channels. If you have concerns, address them privately through appropriate support channels or with senior management."
+    ),
+    (
+        "RULE 9 - Follow Discord TOS & Industry Ethics",
+        "Adhere to both Discord's Terms of Service and web development industry ethical standards. This includes respecting intellectual property, maintaining client confidentiality, and following accessibility guidelines where applicable. [Discord Terms of Service](https://discord.com/terms)"
+    ),
+    (
+        "RULE 10 - No Public Advertising",
+        "Do not advertise external services, agencies, freelancers, or competing products in any public channel. This includes subtle references, portfolio links (unless requested by staff), or mentions of other development teams. Use designated channels for sharing resources when appropriate."
+    ),
+    (
+        "RULE 11 - No Unsolicited Project Requests",
+        "All project inquiries must be made through the proper ticket system, not in public channels. Do not interrupt ongoing discussions with your project needs or repeatedly ask for quotes in community spaces. Respect our workflow and process for handling client requests."
+    ),
+    (
+        "RULE 12 - Professional Conduct",
+        "Maintain professional communication at all times. Use appropriate technical terminology, provide clear requirements when requesting services, and respect confidentiality agreements. Remember that this server represents a professional web development agency, not a casual community."
+    )
+]
+
+TERMS_SECTIONS = [
+    (
+        "Services Overview",
+        "LuvoWeb provides web development, UI/UX design, and Discord bot development services. All services are provided on an as-is basis with no guarantees except as expressly provided in these terms. We reserve the right to refuse service to anyone for any reason at any time."
+    ),
+    (
+        "Project Process",
+        "All projects begin with requirement gathering through our ticket system. Once requirements are confirmed, we provide a timeline and pricing quote. Work begins after initial payment is received. Regular updates will be provided throughout the development process."
+    ),
+    (
+        "Payment Terms",
+        "Payment is structured in three phases: 33% upfront, 33% after demonstrable progress, and 34% upon project completion. Prices are quoted in USD. We accept payment via PayPal, bank transfer, crypto, or other methods as specified in your contract. Invoices must be paid within 7 days of issuance."
+    ),
+    (
+        "Intellectual Property Rights",
+        "Upon final payment, clients receive full ownership rights to the final deliverables created specifically for them. LuvoWeb retains rights to any pre-existing code, frameworks, or tools used in development. We reserve the right to display work in our portfolio unless specifically agreed otherwise."
+    ),
+    (
+        "Revisions and Modifications",
+        "Each project includes a predefined number of revision cycles as specified in your contract. Additional revisions beyond this limit will incur extra charges. Major changes to project scope may require renegotiation of timeline and costs. Minor adjustments after project completion are offered for 30 days at no additional cost."
+    ),
+    (
+        "Client Responsibilities",
+        "Clients are responsible for providing timely feedback, necessary content, and access to accounts required for project completion. Delayed responses from clients may result in project timeline extensions. Clients must ensure they have proper rights to all content provided for use in the project."
+    ),
+    (
+        "Confidentiality",
+        "We treat all client information as confidential and will not share sensitive details with third parties without permission. Clients agree not to disclose proprietary information about our development processes. NDAs are available upon request for projects requiring additional confidentiality."
+    ),
+    (
+        "Cancellation Policy",
+        "Project cancellation by the client after work has begun will result in payment for all work completed up to that point. The initial deposit is non-refundable. LuvoWeb reserves the right to terminate projects due to client inactivity (no response for 21+ days) or violation of these terms."
+    ),
+    (
+        "Refund Policy",
+        "No refunds are provided after project completion and delivery. For cancellations prior to completion, refunds are limited to payments for work not yet performed, minus the non-refundable deposit. Dispute resolution will be attempted before any refund is processed."
+    ),
+    (
+        "Limitation of Liability",
+        "LuvoWeb is not liable for any damages arising from the use of our services beyond the amount paid for the project. We do not guarantee specific business outcomes, traffic increases, or revenue generation. We are not responsible for third-party services integrated into client projects."
+    ),
+    (
+        "Hosting and Maintenance",
+        "Unless specifically included in your contract, hosting, domain registration, and ongoing maintenance are not included in project fees. We offer separate maintenance packages that can be purchased after project completion. Clients are responsible for their hosting environment unless otherwise specified."
+    ),
+    (
+        "Dispute Resolution",
+        "Any disputes will be addressed through good-faith negotiation before other actions are taken. If negotiation fails, disputes will be resolved according to the laws of our registered jurisdiction. By using our services, you agree to these terms in their entirety."
+    )
+]
 
 
-@bot.command(name="rules")
-async def rules_command(ctx):
-    rules_intro = discord.Embed(
-        title="LuvoWeb Community Guidelines",
-        description="Please follow these rules to maintain a professional environment for our web development community.",
+def build_section_embeds(intro_title, intro_description, image_url, sections):
+    intro = discord.Embed(
+        title=intro_title,
+        description=intro_description,
         color=discord.Color.from_rgb(48, 44, 52)
     )
-    rules_intro.set_image(url="https://i.imgur.com/ltnEOM1.png")
+    intro.set_image(url=image_url)
     
-    rule_embeds = [
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 1 - Do Not Spam",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Avoid sending repetitive messages, excessive emojis, or flooding channels with content. This includes project requests, portfolio shares, or technical questions. Use the appropriate channels for your inquiries and limit your messages to maintain a clean, professional environment."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 2 - No Discrimination",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Our agency values diversity and inclusion. Any form of racism, sexism, homophobia, or discriminatory behavior against clients, team members, or community participants will not be tolerated. Treat everyone with respect regardless of their technical experience, background, or business size."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 3 - No Harassment or Bullying",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Criticism of work should be constructive and professional. Do not belittle others' technical skills, design choices, or business decisions. We foster a supportive environment for learning and collaboration, not competition or negativity."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 4 - No NSFW Content",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Keep all content work-appropriate. This is a professional server for web development services. Do not share, request, or discuss explicit material, even in the context of website projects. We maintain a professional image and environment at all times."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 5 - No Unauthorized Selling",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Do not offer competing services or sell products within our community. Only LuvoWeb team members may offer development services here. Clients should not be solicited by other developers in any channel or via DM. Violations will result in immediate removal."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 6 - No Illegal Activities",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Do not request or offer services for illegal websites or applications (phishing, scamming, copyright infringement, etc.). All projects must comply with relevant laws and regulations. We will not participate in or facilitate illegal activities, including software piracy or unauthorized access systems."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 7 - No DM Advertising",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Do not send unsolicited messages to members offering services, requesting work, or promoting external businesses. All inquiries must go through proper channels. Respect others' privacy and our professional environment. Direct message advertising will result in immediate action."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 8 - Respect Staff Authority",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Our staff makes final decisions regarding projects, timelines, and pricing. Do not argue with staff about estimates, deadlines, or technical approaches in public channels. If you have concerns, address them privately through appropriate support channels or with senior management."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 9 - Follow Discord TOS & Industry Ethics",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Adhere to both Discord's Terms of Service and web development industry ethical standards. This includes respecting intellectual property, maintaining client confidentiality, and following accessibility guidelines where applicable. [Discord Terms of Service](https://discord.com/terms)"
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 10 - No Public Advertising",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Do not advertise external services, agencies, freelancers, or competing products in any public channel. This includes subtle references, portfolio links (unless requested by staff), or mentions of other development teams. Use designated channels for sharing resources when appropriate."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 11 - No Unsolicited Project Requests",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="All project inquiries must be made through the proper ticket system, not in public channels. Do not interrupt ongoing discussions with your project needs or repeatedly ask for quotes in community spaces. Respect our workflow and process for handling client requests."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> RULE 12 - Professional Conduct",
+    embeds = [intro]
+    for title, description in sections:
+        embed = discord.Embed(
+            title=f"<:dot:996804674252439733> {title}",
             color=discord.Color.from_rgb(48, 44, 52),
-            description="Maintain professional communication at all times. Use appropriate technical terminology, provide clear requirements when requesting services, and respect confidentiality agreements. Remember that this server represents a professional web development agency, not a casual community."
+            description=description
         )
-    ]
-    
-    for embed in rule_embeds:
         embed.set_footer(text="LuvoWeb • The Future of Freelance", icon_url=ICON_URL)
-    
-    await ctx.send(embed=rules_intro)
-    
-    for embed in rule_embeds:
-        await ctx.send(embed=embed)
-        await asyncio.sleep(0.5)
+        embeds.append(embed)
+    return embeds
+
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def pack_embeds(embeds):
+    messages = []
+    current = []
+    current_size = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or current_size + size > MAX_EMBED_CHARS_PER_MESSAGE):
+            messages.append(current)
+            current = []
+            current_size = 0
+        current.append(embed)
+        current_size += size
+    if current:
+        messages.append(current)
+    return messages
+
+
+PANELS = {
+    "send": pack_embeds(build_ticket_panel_embeds()),
+    "embed": pack_embeds(build_about_embeds()),
+    "rules": pack_embeds(build_section_embeds(
+        "LuvoWeb Community Guidelines",
+        "Please follow these rules to maintain a professional environment for our web development community.",
+        "https://i.imgur.com/ltnEOM1.png",
+        RULE_SECTIONS
+    )),
+    "terms": pack_embeds(build_section_embeds(
+        "LuvoWeb Terms of Service",
+        "Please review our Terms of Service carefully before engaging our services.",
+        "https://i.imgur.com/22VpVZg.jpeg",
+        TERMS_SECTIONS
+    )),
+}
+
+
+class PanelRegistry:
+    def __init__(self, path):
+        self.path = path
+        self.panels = {}
+        self.lock = None
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.panels = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to load panel registry: {e}")
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.panels, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Failed to save panel registry: {e}")
+
+    @staticmethod
+    def fingerprint(embeds, view):
+        payload = {
+            "embeds": [embed.to_dict() for embed in embeds],
+            "components": view.to_components() if view else []
+        }
+        return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+    async def sync(self, channel, name, view=None):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            key = f"{channel.id}:{name}"
+            existing = self.panels.get(key, [])
+            messages = PANELS[name]
+            synced = []
+            stats = Counter()
+            
+            stale = len(messages)
+            
+            for index, embeds in enumerate(messages):
+                message_view = view if view and index == len(messages) - 1 else None
+                fingerprint = self.fingerprint(embeds, message_view)
+                if index < len(existing) and index < stale:
+                    message_id, previous = existing[index]
+                    if previous == fingerprint:
+                        synced.append([message_id, fingerprint])
+                        stats["unchanged"] += 1
+                        continue
+                    try:
+                        await channel.get_partial_message(message_id).edit(embeds=embeds, view=message_view)
+                        synced.append([message_id, fingerprint])
+                        stats["edited"] += 1
+                        continue
+                    except discord.NotFound:
+                        stale = index + 1
+                        for message_id, _ in existing[stale:len(messages)]:
+                            try:
+                                await channel.get_partial_message(message_id).delete()
+                            except discord.NotFound:
+                                pass
+                            stats["deleted"] += 1
+                message = await channel.send(embeds=embeds, view=message_view)
+                synced.append([message.id, fingerprint])
+                stats["created"] += 1
+            
+            for message_id, _ in existing[len(messages):]:
+                try:
+                    await channel.get_partial_message(message_id).delete()
+                except discord.NotFound:
+                    pass
+                stats["deleted"] += 1
+            
+            self.panels[key] = synced
+            await asyncio.to_thread(self.save)
+            print(f"Synced {name} panel in #{channel.name}: " + ", ".join(f"{count} {action}" for action, count in stats.items()))
+            return stats
+
+
+panel_registry = PanelRegistry(os.path.join(DATA_DIR, "panels.json"))
+
+
+async def publish_panel(ctx, name, view=None):
+    await panel_registry.sync(ctx.channel, name, view=view)
+    try:
+        await ctx.message.add_reaction("✅")
+    except discord.HTTPException:
+        pass
+
+
+@bot.command(name="send")
+@commands.has_permissions(administrator=True)
+async def setup(ctx):
+    await publish_panel(ctx, "send", view=PersistentView())
+
+
+@bot.command(name="embed")
+async def about_command(ctx):
+    await publish_panel(ctx, "embed", view=about_view())
+
+
+@bot.command(name="rules")
+async def rules_command(ctx):
+    await publish_panel(ctx, "rules")
 
 
 @bot.command(name="terms")
 async def tos_command(ctx):
-    tos_intro = discord.Embed(
-        title="LuvoWeb Terms of Service",
-        description="Please review our Terms of Service carefully before engaging our services.",
-        color=discord.Color.from_rgb(48, 44, 52)
-    )
-    tos_intro.set_image(url="https://i.imgur.com/22VpVZg.jpeg")
-    
-    tos_embeds = [
-        discord.Embed(
-            title="<:dot:996804674252439733> Services Overview",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="LuvoWeb provides web development, UI/UX design, and Discord bot development services. All services are provided on an as-is basis with no guarantees except as expressly provided in these terms. We reserve the right to refuse service to anyone for any reason at any time."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Project Process",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="All projects begin with requirement gathering through our ticket system. Once requirements are confirmed, we provide a timeline and pricing quote. Work begins after initial payment is received. Regular updates will be provided throughout the development process."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Payment Terms",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Payment is structured in three phases: 33% upfront, 33% after demonstrable progress, and 34% upon project completion. Prices are quoted in USD. We accept payment via PayPal, bank transfer, crypto, or other methods as specified in your contract. Invoices must be paid within 7 days of issuance."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Intellectual Property Rights",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Upon final payment, clients receive full ownership rights to the final deliverables created specifically for them. LuvoWeb retains rights to any pre-existing code, frameworks, or tools used in development. We reserve the right to display work in our portfolio unless specifically agreed otherwise."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Revisions and Modifications",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Each project includes a predefined number of revision cycles as specified in your contract. Additional revisions beyond this limit will incur extra charges. Major changes to project scope may require renegotiation of timeline and costs. Minor adjustments after project completion are offered for 30 days at no additional cost."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Client Responsibilities",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Clients are responsible for providing timely feedback, necessary content, and access to accounts required for project completion. Delayed responses from clients may result in project timeline extensions. Clients must ensure they have proper rights to all content provided for use in the project."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Confidentiality",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="We treat all client information as confidential and will not share sensitive details with third parties without permission. Clients agree not to disclose proprietary information about our development processes. NDAs are available upon request for projects requiring additional confidentiality."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Cancellation Policy",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Project cancellation by the client after work has begun will result in payment for all work completed up to that point. The initial deposit is non-refundable. LuvoWeb reserves the right to terminate projects due to client inactivity (no response for 21+ days) or violation of these terms."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Refund Policy",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="No refunds are provided after project completion and delivery. For cancellations prior to completion, refunds are limited to payments for work not yet performed, minus the non-refundable deposit. Dispute resolution will be attempted before any refund is processed."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Limitation of Liability",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="LuvoWeb is not liable for any damages arising from the use of our services beyond the amount paid for the project. We do not guarantee specific business outcomes, traffic increases, or revenue generation. We are not responsible for third-party services integrated into client projects."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Hosting and Maintenance",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Unless specifically included in your contract, hosting, domain registration, and ongoing maintenance are not included in project fees. We offer separate maintenance packages that can be purchased after project completion. Clients are responsible for their hosting environment unless otherwise specified."
-        ),
-        discord.Embed(
-            title="<:dot:996804674252439733> Dispute Resolution",
-            color=discord.Color.from_rgb(48, 44, 52),
-            description="Any disputes will be addressed through good-faith negotiation before other actions are taken. If negotiation fails, disputes will be resolved according to the laws of our registered jurisdiction. By using our services, you agree to these terms in their entirety."
+    await publish_panel(ctx, "terms")
+
+
+AI_API_URL = os.getenv("AI_API_URL", "https://chat-api-rp7a.onrender.com/v1/chat/completions")
+AI_MODEL = os.getenv("AI_MODEL", "o3-mini")
+AI_HEDGE_DEFAULT_DELAY = env_float("AI_HEDGE_DEFAULT_DELAY", 8.0)
+AI_HEDGE_MIN_DELAY = env_float("AI_HEDGE_MIN_DELAY", 1.0)
+AI_TIMEOUT_MIN = env_float("AI_TIMEOUT_MIN", 5.0)
+AI_TIMEOUT_MAX = env_float("AI_TIMEOUT_MAX", 30.0)
+AI_TIMEOUT_MULTIPLIER = env_float("AI_TIMEOUT_MULTIPLIER", 3.0)
+AI_BACKOFF_BASE = env_float("AI_BACKOFF_BASE", 0.5)
+AI_BACKOFF_MAX = env_float("AI_BACKOFF_MAX", 8.0)
+AI_BREAKER_THRESHOLD = env_int("AI_BREAKER_THRESHOLD", 5)
+AI_BREAKER_COOLDOWN = env_float("AI_BREAKER_COOLDOWN", 30.0)
+AI_BREAKER_MAX_COOLDOWN = env_float("AI_BREAKER_MAX_COOLDOWN", 300.0)
+
+ASK_STREAMING = os.getenv("ASK_STREAMING", "true").lower() == "true"
+ASK_EDIT_INTERVAL = env_float("ASK_EDIT_INTERVAL", 1.5)
+ASK_CACHE_SIZE = env_int("ASK_CACHE_SIZE", 500)
+ASK_CACHE_THRESHOLD = env_float("ASK_CACHE_THRESHOLD", 0.75)
+ASK_CACHE_TTL = env_int("ASK_CACHE_TTL", 60 * 60 * 24 * 7)
+POLICY_ANSWER_THRESHOLD = env_float("POLICY_ANSWER_THRESHOLD", 0.4)
+POLICY_ANSWER_MARGIN = env_float("POLICY_ANSWER_MARGIN", 1.5)
+POLICY_CONTEXT_THRESHOLD = env_float("POLICY_CONTEXT_THRESHOLD", 0.15)
+
+AI_FALLBACK_RESPONSE = "Sorry, I couldn't get a response from any AI provider at the moment."
+
+
+class AIProvider:
+    def __init__(self, name, url, model, provider=None, api_key=None):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.provider = provider
+        self.api_key = api_key
+        self.latencies = deque(maxlen=100)
+        self.outcomes = deque(maxlen=50)
+        self.requests = 0
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.cooldown = AI_BREAKER_COOLDOWN
+        self.opened_at = 0.0
+        self.probing = False
+
+    def record(self, latency, ok):
+        self.requests += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+            if self.state != "closed":
+                print(f"AI provider {self.name} recovered, circuit closed")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.cooldown = AI_BREAKER_COOLDOWN
+        else:
+            self.consecutive_failures += 1
+            if self.state == "half_open":
+                self.trip(min(self.cooldown * 2, AI_BREAKER_MAX_COOLDOWN))
+            elif self.state == "closed" and self.consecutive_failures >= AI_BREAKER_THRESHOLD:
+                self.trip(AI_BREAKER_COOLDOWN)
+
+    def trip(self, cooldown):
+        self.state = "open"
+        self.cooldown = cooldown
+        self.opened_at = time.monotonic()
+        print(f"AI provider {self.name} failing, circuit open for {cooldown:.0f}s")
+
+    def current_state(self):
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return self.state
+
+    def available(self):
+        state = self.current_state()
+        return state == "closed" or (state == "half_open" and not self.probing)
+
+    def begin_request(self):
+        if self.current_state() != "half_open":
+            return False
+        self.state = "half_open"
+        self.probing = True
+        return True
+
+    def timeout(self):
+        p95 = self.percentile(0.95)
+        if p95 is None or len(self.latencies) < 5:
+            return AI_TIMEOUT_MAX
+        return min(AI_TIMEOUT_MAX, max(AI_TIMEOUT_MIN, p95 * AI_TIMEOUT_MULTIPLIER))
+
+    def percentile(self, percentile):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def healthy(self):
+        return len(self.outcomes) < 5 or self.error_rate() < 0.5
+
+    def hedge_delay(self):
+        p95 = self.percentile(0.95)
+        if p95 is None or len(self.latencies) < 5:
+            return AI_HEDGE_DEFAULT_DELAY
+        return max(p95, AI_HEDGE_MIN_DELAY)
+
+    def score(self):
+        p50 = self.percentile(0.5)
+        if p50 is None:
+            p50 = AI_HEDGE_MIN_DELAY
+        return p50 * (1 + 4 * self.error_rate())
+
+
+def load_ai_providers():
+    raw = os.getenv("AI_PROVIDERS")
+    if raw:
+        try:
+            providers = [
+                AIProvider(
+                    name=entry.get("name") or entry.get("provider") or entry.get("model", AI_MODEL),
+                    url=entry.get("url", AI_API_URL),
+                    model=entry.get("model", AI_MODEL),
+                    provider=entry.get("provider"),
+                    api_key=entry.get("api_key")
+                )
+                for entry in json.loads(raw)
+            ]
+            if providers:
+                return providers
+        except (ValueError, AttributeError, TypeError) as e:
+            print(f"Warning: AI_PROVIDERS is not a valid JSON list of providers ({e}), using the default provider")
+    return [AIProvider("PollinationsAI", AI_API_URL, AI_MODEL, provider="PollinationsAI")]
+
+
+class AIStreamTruncated(Exception):
+    pass
+
+
+class AIRouter:
+    def __init__(self, providers):
+        self.providers = providers
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def available(self):
+        return any(provider.available() for provider in self.providers)
+
+    def ranked(self):
+        return sorted(
+            (provider for provider in self.providers if provider.available()),
+            key=lambda provider: (not provider.healthy(), provider.score())
         )
-    ]
-    
-    for embed in tos_embeds:
-        embed.set_footer(text="LuvoWeb • The Future of Freelance", icon_url=ICON_URL)
-    
-    await ctx.send(embed=tos_intro)
-    
-    for embed in tos_embeds:
-        await ctx.send(embed=embed)
-        await asyncio.sleep(0.5) 
 
-async def get_ai_response(prompt, max_attempts=3):
-    model = "o3-mini"
-    providers = ["PollinationsAI"]
-    api_url = "https://chat-api-rp7a.onrender.com/v1/chat/completions"
-    
-    messages = [{"role": "user", "content": prompt}]
-    
-    def query_provider(provider):
+    @staticmethod
+    def request_args(provider, messages, stream):
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream" if stream else "application/json"
+        }
+        if provider.api_key:
+            headers["Authorization"] = f"Bearer {provider.api_key}"
+        payload = {
+            "model": provider.model,
+            "messages": messages,
+            "stream": stream
+        }
+        if provider.provider:
+            payload["provider"] = provider.provider
+        return headers, payload
+
+    async def query(self, provider, messages, max_attempts, probe=False):
+        headers, payload = self.request_args(provider, messages, False)
+        if probe:
+            max_attempts = 1
+        
         for attempt in range(max_attempts):
+            if attempt:
+                if provider.state == "open":
+                    break
+                await asyncio.sleep(random.uniform(0, min(AI_BACKOFF_MAX, AI_BACKOFF_BASE * 2 ** attempt)))
+            
+            started = time.monotonic()
             try:
-                response = requests.post(
-                    api_url,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "provider": provider,
-                        "stream": False
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    content = data["choices"][0]["message"]["content"]
-                    content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
-                    return content, provider
+                async with bot.session.post(
+                    provider.url,
+                    headers=headers,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=provider.timeout())
+                ) as response:
+                    if response.status == 200:
+                        data = await response.json(content_type=None)
+                        content = data["choices"][0]["message"]["content"]
+                        provider.record(time.monotonic() - started, True)
+                        return re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
+                provider.record(time.monotonic() - started, False)
                 
             except Exception as e:
+                provider.record(time.monotonic() - started, False)
                 if attempt == max_attempts - 1:
-                    print(f"Error with {provider}: {str(e)}")
+                    print(f"Error with {provider.name}: {str(e)}")
         
-        return None, provider
-    
-    result = None
-    successful_provider = None
-    
-    with ThreadPoolExecutor(max_workers=len(providers)) as executor:
-        future_to_provider = {executor.submit(query_provider, provider): provider for provider in providers}
+        return None
+
+    async def complete(self, messages, max_attempts=3):
+        candidates = self.ranked()
+        if not candidates:
+            return None
+        in_flight = {}
+        next_index = 0
+        hedged = False
         
-        for future in as_completed(future_to_provider):
-            response, provider = future.result()
-            if response:
-                result = response
-                successful_provider = provider
-                break
+        def launch():
+            nonlocal next_index
+            while next_index < len(candidates):
+                provider = candidates[next_index]
+                next_index += 1
+                if not provider.available():
+                    continue
+                probe = provider.begin_request()
+                task = asyncio.create_task(self.query(provider, messages, max_attempts, probe))
+                if probe:
+                    task.add_done_callback(lambda _, provider=provider: setattr(provider, "probing", False))
+                in_flight[task] = provider
+                return True
+            return False
+        
+        if not launch():
+            return None
+        try:
+            while in_flight:
+                hedge_delay = None
+                if len(in_flight) == 1 and next_index < len(candidates):
+                    hedge_delay = next(iter(in_flight.values())).hedge_delay()
+                
+                done, _ = await asyncio.wait(in_flight, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    hedged = True
+                    launch()
+                    continue
+                
+                for task in done:
+                    provider = in_flight.pop(task)
+                    result = task.result()
+                    if result:
+                        if hedged and provider is not candidates[0]:
+                            self.hedge_wins += 1
+                        return result
+                
+                if not in_flight and next_index < len(candidates):
+                    launch()
+            return None
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+
+    async def stream(self, messages):
+        for provider in self.ranked():
+            if not provider.available():
+                continue
+            probe = provider.begin_request()
+            headers, payload = self.request_args(provider, messages, True)
+            
+            started = time.monotonic()
+            yielded = False
+            finished = False
+            try:
+                async with bot.session.post(
+                    provider.url,
+                    headers=headers,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=None, sock_connect=AI_TIMEOUT_MAX, sock_read=provider.timeout())
+                ) as response:
+                    if response.status != 200:
+                        provider.record(time.monotonic() - started, False)
+                        continue
+                    
+                    if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                        data = await response.json(content_type=None)
+                        yielded = True
+                        finished = True
+                        yield data["choices"][0]["message"]["content"]
+                    else:
+                        async for raw_line in response.content:
+                            line = raw_line.decode("utf-8", errors="ignore").strip()
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                finished = True
+                                break
+                            choices = json.loads(data).get("choices") or []
+                            if choices and choices[0].get("finish_reason"):
+                                finished = True
+                            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                            if delta:
+                                yielded = True
+                                yield delta
+                    
+                    if finished:
+                        provider.record(time.monotonic() - started, True)
+                        return
+                    provider.record(time.monotonic() - started, False)
+                    print(f"Streaming error with {provider.name}: stream ended before completion")
+            except Exception as e:
+                provider.record(time.monotonic() - started, False)
+                print(f"Streaming error with {provider.name}: {str(e)}")
+            finally:
+                if probe:
+                    provider.probing = False
+            
+            if yielded:
+                raise AIStreamTruncated(f"Response from {provider.name} was cut off")
+
+
+ai_router = AIRouter(load_ai_providers())
+
+
+class ThinkStripper:
+    OPEN = "<think>"
+    CLOSE = "</think>"
+
+    def __init__(self):
+        self.buffer = ""
+        self.in_think = False
+
+    @staticmethod
+    def partial_tag_length(text, tag):
+        for length in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:length]):
+                return length
+        return 0
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        visible = []
+        while True:
+            if self.in_think:
+                end = self.buffer.find(self.CLOSE)
+                if end == -1:
+                    keep = self.partial_tag_length(self.buffer, self.CLOSE)
+                    self.buffer = self.buffer[len(self.buffer) - keep:]
+                    break
+                self.buffer = self.buffer[end + len(self.CLOSE):]
+                self.in_think = False
+            else:
+                start = self.buffer.find(self.OPEN)
+                if start == -1:
+                    keep = self.partial_tag_length(self.buffer, self.OPEN)
+                    visible.append(self.buffer[:len(self.buffer) - keep])
+                    self.buffer = self.buffer[len(self.buffer) - keep:]
+                    break
+                visible.append(self.buffer[:start])
+                self.buffer = self.buffer[start + len(self.OPEN):]
+                self.in_think = True
+        return "".join(visible)
+
+    def flush(self):
+        remaining = "" if self.in_think else self.buffer
+        self.buffer = ""
+        return remaining
+
+
+async def get_ai_response(prompt, max_attempts=3):
+    messages = [{"role": "user", "content": prompt}]
+    
+    result = await ai_router.complete(messages, max_attempts)
     
     if result:
         return result
     else:
-        return "Sorry, I couldn't get a response from any AI provider at the moment."
+        return AI_FALLBACK_RESPONSE
+
+
+async def stream_ai_response(prompt):
+    stripper = ThinkStripper()
+    chunks = ai_router.stream([{"role": "user", "content": prompt}])
+    try:
+        async for chunk in chunks:
+            visible = stripper.feed(chunk)
+            if visible:
+                yield visible
+    except AIStreamTruncated:
+        remaining = stripper.flush()
+        if remaining:
+            yield remaining
+        raise
+    finally:
+        await chunks.aclose()
+    remaining = stripper.flush()
+    if remaining:
+        yield remaining
 
 @bot.tree.command(name='meme', description='Shows a random meme')
 @app_commands.checks.cooldown(1, 7)
 async def meme(interaction: discord.Interaction):
     try:
-        response = requests.get('https://meme-api.com/gimme/dankmemes')
-        response.raise_for_status()
-        data = response.json()
+        async with bot.session.get('https://meme-api.com/gimme/dankmemes') as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
         
         embed = discord.Embed(title=data['title'])
         embed.set_image(url=data['preview'][-1])
@@ -830,9 +2212,9 @@ async def meme(interaction: discord.Interaction):
 @app_commands.checks.cooldown(1, 4)
 async def quote(interaction: discord.Interaction):
     try:
-        response = requests.get("https://zenquotes.io/api/random")
-        response.raise_for_status()
-        data = response.json()
+        async with bot.session.get("https://zenquotes.io/api/random") as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
         
         quote_text = f"{data[0]['q']} - {data[0]['a']}"
         
@@ -866,56 +2248,335 @@ async def version(interaction: discord.Interaction):
 
 @bot.event
 async def on_ready():
-    print(f"Logged in as {bot.user.name}")
+    if bot.ready_once:
+        print(f"Reconnected as {bot.user.name}")
+    else:
+        bot.ready_once = True
+        print(f"Logged in as {bot.user.name}, ready {time.monotonic() - bot.started_at:.2f}s after startup")
     
-    try:
-        guild = discord.Object(id=GUILD) if GUILD != 0 else None
-        await bot.tree.sync(guild=guild)
-        print(f"Slash commands synced {'to guild' if guild else 'globally'}")
+    guild = bot.get_guild(GUILD)
+    if guild:
+        open_tickets.build(guild)
+        ticket_pool.start(guild)
+    scheduler.start()
+    if guild:
+        asyncio.create_task(ticket_journal.resume(guild))
 
-        bot.add_view(PersistentView())
 
-        bot.add_view(TicketView(None))  
-        bot.add_view(ConfirmCloseView(None))
-        print("Persistent views added")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
+@bot.event
+async def on_connect():
+    ticket_journal.mark_gaps()
 
 
 @bot.event
-async def on_member_join(member):
-    try:
-        showcase_channel = bot.get_channel(1326998748718698563)
+async def on_raw_message_edit(payload):
+    if not is_ticket_channel(bot.get_channel(payload.channel_id)):
+        return
+    data = payload.data
+    ticket_journal.append(payload.channel_id, {
+        "op": "edit",
+        "id": payload.message_id,
+        "content": data.get("content"),
+        "embeds": [[embed.get("title"), embed.get("description")] for embed in data["embeds"]] if "embeds" in data else None,
+        "attachments": [[attachment.get("filename"), attachment.get("url")] for attachment in data["attachments"]] if "attachments" in data else None
+    })
+
+
+@bot.event
+async def on_raw_message_delete(payload):
+    if is_ticket_channel(bot.get_channel(payload.channel_id)):
+        ticket_journal.append(payload.channel_id, {"op": "delete", "id": payload.message_id})
+
+
+@bot.event
+async def on_raw_bulk_message_delete(payload):
+    if is_ticket_channel(bot.get_channel(payload.channel_id)):
+        ticket_journal.append(payload.channel_id, *({"op": "delete", "id": message_id} for message_id in payload.message_ids))
+
+
+@bot.event
+async def on_guild_channel_create(channel):
+    if is_ticket_channel(channel):
+        ticket_journal.start(channel.id)
+        open_tickets.add(channel)
+
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    if is_ticket_channel(after):
+        open_tickets.add(after)
+    elif is_ticket_channel(before):
+        open_tickets.remove(after.id)
+
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    open_tickets.remove(channel.id)
+    await ticket_journal.discard(channel.id)
+
+
+SHOWCASE_CHANNEL_ID = 1326998748718698563
+
+
+class WelcomeCoalescer:
+    def __init__(self, window, max_mentions, raid_threshold):
+        self.window = window
+        self.max_mentions = max_mentions
+        self.raid_threshold = raid_threshold
+        self.pending = []
+        self.flusher = None
+        self.joins = 0
+        self.sent = 0
+        self.suppressed = 0
+
+    def add(self, member):
+        self.joins += 1
+        self.pending.append(member.id)
+        if self.flusher is None:
+            self.flusher = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        await asyncio.sleep(self.window)
+        member_ids, self.pending = self.pending, []
+        self.flusher = None
+        
+        if len(member_ids) > self.raid_threshold:
+            self.suppressed += len(member_ids)
+            print(f"Suppressed welcome for {len(member_ids)} joins in {self.window:.0f}s (possible raid)")
+            return
+        
+        showcase_channel = bot.get_channel(SHOWCASE_CHANNEL_ID)
         if not showcase_channel:
             print("Showcase channel not found")
             return
+        
+        mentions = " ".join(f"<@{member_id}>" for member_id in member_ids[:self.max_mentions])
+        if len(member_ids) > self.max_mentions:
+            mentions += f" and {len(member_ids) - self.max_mentions} others"
+        welcome_text = f"👋 {mentions} Welcome to LuvoWeb! Check out our website development & discord bot service showcases in this channel. For orders, visit the tickets channel."
+        
+        try:
+            sent_message = await showcase_channel.send(welcome_text)
+            self.sent += 1
+            scheduler.delete_message_later(sent_message, 60)
+        except Exception as e:
+            print(f"Error in welcome message: {e}")
+
+
+welcome_coalescer = WelcomeCoalescer(WELCOME_WINDOW, WELCOME_MAX_MENTIONS, WELCOME_RAID_THRESHOLD)
+
+
+@bot.event
+async def on_member_join(member):
+    welcome_coalescer.add(member)
+
+
+CUSTOM_EMOJI_RE = re.compile(r"<a?:\w+:\d+>")
+UNICODE_EMOJI_RE = re.compile("[\U0001F000-\U0001FAFF\u2600-\u27BF\uFE0F\u200D]+")
+
+
+def normalize_message_content(content):
+    text = CUSTOM_EMOJI_RE.sub(" :emoji: ", content.lower())
+    text = UNICODE_EMOJI_RE.sub(" :emoji: ", text)
+    text = re.sub(r"(:emoji:\s*)+", ":emoji: ", text)
+    return " ".join(text.split())
+
+
+class VerdictCache:
+    def __init__(self, max_size, ttl, path):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(content):
+        normalized = normalize_message_content(content)
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, content):
+        key = self.key(content)
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, content, verdict):
+        key = self.key(content)
+        self.entries[key] = (verdict, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Failed to load verdict cache: {e}")
+            return
+        now = time.time()
+        for key, verdict, stored_at in snapshot[-self.max_size:]:
+            if now - stored_at <= self.ttl:
+                self.entries[key] = (verdict, stored_at)
+        print(f"Loaded {len(self.entries)} cached moderation verdicts")
 
-        welcome_text = f"👋 {member.mention} Welcome to LuvoWeb! Check out our website development & discord bot service showcases in this channel. For orders, visit the tickets channel."
+    def snapshot(self):
+        return [[key, verdict, stored_at] for key, (verdict, stored_at) in self.entries.items()]
 
-        sent_message = await showcase_channel.send(welcome_text)
-        await asyncio.sleep(60)
+    def save(self, snapshot=None):
+        snapshot = self.snapshot() if snapshot is None else snapshot
         try:
-            await sent_message.delete()
-        except discord.NotFound:
-            pass
-    except Exception as e:
-        print(f"Error in welcome message: {e}")
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Failed to save verdict cache: {e}")
 
 
-async def evaluate_message_content(message_content):
-    prompt = (
-        "As the owner of a web development agency Discord server, your focus is on fostering natural "
-        "discussions, collaboration, and knowledge sharing about web development. Promotions, advertisements, "
-        "self-promotion, or soliciting — such as offering services, seeking clients, or posting personal "
-        "project links with commercial intent, or even just saying they are a web developer — are strictly prohibited. Direct requests for services, hiring, but for web development software development and related categories only, others can be marked as DELETE. But please keep in mind that it's a discord server and people post emojis and talk about random stuff. so DELETE should only be used when it's neccessary."
-        "or any transactional conversations should be redirected to proper channels. Your task is to evaluate "
-        "messages and respond with \"DELETE\" for those that break these guidelines, \"REDIRECT\" for clients "
-        "seeking services, or \"GOOD\" for messages that align with the community's purpose. Message is \"\"\""
-        f"{message_content}\"\"\""
+verdict_cache = VerdictCache(VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL, os.path.join(DATA_DIR, "verdict_cache.json"))
+
+
+@tasks.loop(minutes=10)
+async def save_snapshots():
+    if VERDICT_CACHE_SNAPSHOT:
+        await asyncio.to_thread(verdict_cache.save, verdict_cache.snapshot())
+    await asyncio.to_thread(answer_cache.save, answer_cache.snapshot())
+
+
+@tasks.loop(hours=24)
+async def prune_transcript_index():
+    try:
+        await asyncio.to_thread(transcript_index.prune, TRANSCRIPT_INDEX_RETENTION_DAYS)
+    except Exception as e:
+        print(f"Failed to prune transcript index: {e}")
+
+
+moderation_stats = Counter()
+
+INVITE_RE = re.compile(r"(discord\.gg|discord(?:app)?\.com/invite)/\S+", re.IGNORECASE)
+URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+AD_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r"\bdm me\b",
+        r"\bhire me\b",
+        r"\bcheap (web ?sites?|bots?|designs?|logos?)\b",
+        r"\bi (can )?(make|build|develop|design|code) (you )?(a |an )?(web ?sites?|bots?|apps?|logos?)\b",
+        r"\bi'?m a (web|freelance|full ?stack|front ?end|back ?end) ?(developer|dev|designer)\b",
+        r"\bmy (rates|prices|pricing) (are|start|starting|is)\b",
+        r"\bmy services (are|start|starting) (open|available|at|from)\b",
+        r"\bcommissions? (are )?(now )?open\b",
+        r"\b(commission|order) slots (are )?(now )?open\b",
+        r"\bcheck (out )?my (website|portfolio|server|channel)\b",
+    )
+]
+REDIRECT_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r"\b(looking for|hiring|want to hire|need to hire) (a |an |someone |some )?(web ?developers?|developers?|devs?|designers?)\b"
+        r"(?! (account|mode|console|portal|tools?|environment|server|build|branch|docs?|key))",
+        r"\bneed (a |an |someone |some )?(web ?developers?|developers?|designers?) (to|for (my|our|a|an))\b",
+        r"\b(need|want) (a |an )?(web ?site|discord bot|bot|landing page|app) (made|built|developed)\b",
+        r"\bhow much (do you charge|would you charge|for|to make|to build|would it cost to (make|build)|does it cost to (make|build)) "
+        r"(me |us )?(a |an )?(web ?site|discord bot|bot|app|landing page|logo)\b",
+        r"\b(can|could) (you|someone|anyone) (make|build|develop|design) (me |us )?(a |an )(web ?site|discord bot|bot|app|landing page|logo)\b",
     )
+]
+SAFE_WORDS = {
+    "hi", "hello", "hey", "heya", "yo", "sup", "gm", "gn", "good", "morning", "night", "evening",
+    "thanks", "thank", "you", "ty", "thx", "np", "lol", "lmao", "haha", "ok", "okay", "k", "yes",
+    "no", "yeah", "nice", "cool", "wow", "welcome", "bye", "cya", "gg", "xd", ":emoji:",
+}
+TECH_WORDS = {
+    "python", "javascript", "js", "typescript", "ts", "react", "next", "nextjs", "vue", "node",
+    "css", "html", "api", "bug", "error", "function", "database", "sql", "discord.py", "django",
+    "flask", "tailwind", "deploy", "hosting", "git", "npm", "async", "await",
+}
+
+
+def classify_locally(content):
+    normalized = normalize_message_content(content)
+    words = normalized.split()
     
-    response = await get_ai_response(prompt)
+    if INVITE_RE.search(content):
+        return "DELETE", 0.98
+    
+    ad_hits = sum(1 for pattern in AD_PATTERNS if pattern.search(normalized))
+    has_url = bool(URL_RE.search(content))
+    if ad_hits:
+        return "DELETE", min(0.99, round(0.3 + 0.3 * ad_hits + (0.1 if has_url else 0), 2))
+    
+    redirect_hits = sum(1 for pattern in REDIRECT_PATTERNS if pattern.search(normalized))
+    if redirect_hits:
+        return "REDIRECT", min(0.99, round(0.3 + 0.3 * redirect_hits, 2))
+    
+    if has_url:
+        return None, 0.0
+    
+    if not words or all(word == ":emoji:" for word in words):
+        return "GOOD", 1.0
+    
+    if len(words) <= 6 and all(word.strip("!?.,") in SAFE_WORDS for word in words):
+        return "GOOD", 0.97
+    
+    if "```" in content or (normalized.endswith("?") and any(word.strip("?.,!") in TECH_WORDS for word in words)):
+        return "GOOD", 0.92
     
+    if len(normalized) <= 12:
+        return "GOOD", 0.85
+    
+    return None, 0.0
+
+
+LOCAL_THRESHOLDS = {
+    "DELETE": LOCAL_DELETE_THRESHOLD,
+    "REDIRECT": LOCAL_REDIRECT_THRESHOLD,
+    "GOOD": LOCAL_GOOD_THRESHOLD,
+}
+
+
+async def moderate_message_content(message_content):
+    verdict, confidence = classify_locally(message_content)
+    if verdict and confidence >= LOCAL_THRESHOLDS[verdict]:
+        moderation_stats[f"local_{verdict.lower()}"] += 1
+        return verdict
+    
+    if not ai_router.available():
+        cached = verdict_cache.get(message_content)
+        if cached:
+            moderation_stats["cache"] += 1
+            return cached
+        
+        moderation_stats["degraded"] += 1
+        if MODERATION_DEGRADED_MODE == "local" and verdict and confidence >= MODERATION_DEGRADED_THRESHOLD:
+            return verdict
+        return "GOOD"
+    
+    return await evaluate_message_content(message_content)
+
+
+MODERATION_POLICY = (
+    "As the owner of a web development agency Discord server, your focus is on fostering natural "
+    "discussions, collaboration, and knowledge sharing about web development. Promotions, advertisements, "
+    "self-promotion, or soliciting — such as offering services, seeking clients, or posting personal "
+    "project links with commercial intent, or even just saying they are a web developer — are strictly prohibited. Direct requests for services, hiring, but for web development software development and related categories only, others can be marked as DELETE. But please keep in mind that it's a discord server and people post emojis and talk about random stuff. so DELETE should only be used when it's neccessary."
+    "or any transactional conversations should be redirected to proper channels. Your task is to evaluate "
+    "messages and respond with \"DELETE\" for those that break these guidelines, \"REDIRECT\" for clients "
+    "seeking services, or \"GOOD\" for messages that align with the community's purpose. "
+)
+
+
+def parse_verdict(response):
     if "DELETE" in response.upper():
         return "DELETE"
     elif "REDIRECT" in response.upper():
@@ -923,6 +2584,135 @@ async def evaluate_message_content(message_content):
     else:
         return "GOOD"
 
+
+async def evaluate_single_message(message_content):
+    prompt = MODERATION_POLICY + f"Message is \"\"\"{message_content}\"\"\""
+    
+    response = await get_ai_response(prompt)
+    if response == AI_FALLBACK_RESPONSE:
+        return None
+    return parse_verdict(response)
+
+
+def parse_batch_verdicts(response, message_ids):
+    match = re.search(r"\{.*\}", response, flags=re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    
+    verdicts = {}
+    for message_id in message_ids:
+        verdict = str(data.get(message_id, "")).upper()
+        if verdict in ("DELETE", "REDIRECT", "GOOD"):
+            verdicts[message_id] = verdict
+    return verdicts
+
+
+class ModerationBatcher:
+    def __init__(self, max_size, max_wait):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.pending = OrderedDict()
+        self.timer = None
+        self.running = set()
+
+    async def evaluate(self, message_content):
+        if self.max_size <= 1:
+            return await evaluate_single_message(message_content)
+        
+        key = VerdictCache.key(message_content)
+        if key in self.pending:
+            return await asyncio.shield(self.pending[key][1])
+        
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = (message_content, future)
+        
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush)
+        
+        return await asyncio.shield(future)
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        
+        batch = list(self.pending.values())
+        self.pending = OrderedDict()
+        task = asyncio.create_task(self.run_batch(batch))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def run_batch(self, batch):
+        try:
+            if len(batch) == 1:
+                verdicts = [await evaluate_single_message(batch[0][0])]
+            else:
+                verdicts = await self.evaluate_batch(batch)
+        except Exception as e:
+            print(f"Moderation batch error: {e}")
+            verdicts = [None] * len(batch)
+        
+        for (_, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
+
+    async def evaluate_batch(self, batch):
+        message_ids = [f"m{index}" for index in range(1, len(batch) + 1)]
+        payload = json.dumps(
+            [{"id": message_id, "text": content} for message_id, (content, _) in zip(message_ids, batch)],
+            ensure_ascii=False
+        )
+        prompt = (
+            MODERATION_POLICY
+            + "Evaluate each of the following messages independently. Respond ONLY with a JSON object mapping "
+            "each message id to \"DELETE\", \"REDIRECT\" or \"GOOD\", for example {\"m1\": \"GOOD\"}. "
+            f"Messages: {payload}"
+        )
+        
+        moderation_stats["ai_batches"] += 1
+        response = await get_ai_response(prompt)
+        if response == AI_FALLBACK_RESPONSE:
+            return [None] * len(batch)
+        
+        parsed = parse_batch_verdicts(response, message_ids) or {}
+        missing = [index for index, message_id in enumerate(message_ids) if message_id not in parsed]
+        if missing:
+            moderation_stats["batch_fallbacks"] += len(missing)
+            retried = await asyncio.gather(*(evaluate_single_message(batch[index][0]) for index in missing))
+            for index, verdict in zip(missing, retried):
+                parsed[message_ids[index]] = verdict
+        
+        return [parsed[message_id] for message_id in message_ids]
+
+
+moderation_batcher = ModerationBatcher(MODERATION_BATCH_SIZE, MODERATION_BATCH_WAIT)
+
+
+async def evaluate_message_content(message_content):
+    cached = verdict_cache.get(message_content)
+    if cached:
+        moderation_stats["cache"] += 1
+        return cached
+    
+    verdict = await moderation_batcher.evaluate(message_content)
+    if verdict is None:
+        moderation_stats["ai_failed"] += 1
+        return "GOOD"
+    moderation_stats["ai"] += 1
+    
+    verdict_cache.put(message_content, verdict)
+    return verdict
+
 ALLOWED_AD_USER_ID = 1330302391257661502
 ad_cooldown = {}
 
@@ -948,11 +2738,7 @@ async def check_ad_permission(user_id, message_content, channel):
                 f"Please wait {remaining_days} days and {remaining_hours} hours before posting another ad."
             )
             
-            await asyncio.sleep(180)
-            try:
-                await warning_msg.delete()
-            except discord.errors.NotFound:
-                pass
+            scheduler.delete_message_later(warning_msg, 180)
                 
             return False
     
@@ -962,6 +2748,9 @@ async def check_ad_permission(user_id, message_content, channel):
 
 @bot.event
 async def on_message(message):
+    if is_ticket_channel(message.channel):
+        ticket_journal.append(message.channel.id, journal_record(message))
+    
     if message.author.bot:
         return
     
@@ -971,125 +2760,597 @@ async def on_message(message):
         return
     
     if message.channel.category and message.channel.category.name == "Community":
-        evaluation = await evaluate_message_content(message.content)
+        await moderation_queue.submit(message)
+
+
+class ModerationQueue:
+    def __init__(self, max_size, worker_count, overflow):
+        self.max_size = max_size
+        self.worker_count = worker_count
+        self.overflow = overflow
+        self.queue = None
+        self.workers = []
+        self.closing = False
+        self.wait_times = deque(maxlen=500)
+        self.max_depth = 0
+        self.dropped = 0
+        self.shed = 0
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+
+    async def submit(self, message):
+        if self.closing or self.queue is None:
+            return
         
-        if evaluation == "DELETE":
-            ad_allowed = await check_ad_permission(message.author.id, message.content, message.channel)
-            
-            if ad_allowed:
+        item = (time.monotonic(), message)
+        if self.queue.full():
+            if self.overflow == "block":
+                await self.queue.put(item)
+            elif self.overflow == "drop_oldest":
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+                self.queue.put_nowait(item)
+            else:
+                self.shed += 1
+                await moderate_message_locally(message)
                 return
-                
-            try:
-                deletion_channel = bot.get_channel(1352513103333560340)
-                if deletion_channel:
-                    embed = discord.Embed(
-                        title="🚫 Message Deleted - Rule Violation",
-                        description=f"A message by {message.author.mention} in {message.channel.mention} was deleted for violating community guidelines.",
-                        color=discord.Color.red(),
-                        timestamp=datetime.datetime.utcnow()
-                    )
-                    
-                    embed.add_field(
-                        name="User",
-                        value=f"{message.author.mention} (`{message.author.name}`)",
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="Sent at",
-                        value=f"<t:{int(message.created_at.timestamp())}:F>",
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="Deleted Message",
-                        value=f"```{message.content[:1000]}{'...' if len(message.content) > 1000 else ''}```",
-                        inline=False
-                    )
+        else:
+            self.queue.put_nowait(item)
+        
+        self.max_depth = max(self.max_depth, self.queue.qsize())
 
-                    user_avatar_url = message.author.avatar.url if message.author.avatar else message.author.default_avatar.url
-                    embed.set_thumbnail(url=user_avatar_url)
-                    
-                    embed.set_footer(text="LuvoWeb • Moderation Alert", icon_url=ICON_URL)
-                    
-                    await deletion_channel.send(embed=embed)
-                else:
-                    print("Deletion notification channel not found")
+    async def worker(self):
+        while True:
+            enqueued_at, message = await self.queue.get()
+            try:
+                self.wait_times.append(time.monotonic() - enqueued_at)
+                await moderate_message(message)
             except Exception as e:
-                print(f"Failed to send deletion notification: {str(e)}")
-            
-            await message.delete()
+                print(f"Moderation worker error: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def drain(self, timeout=15):
+        self.closing = True
+        if self.queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Moderation queue drain timed out with {self.queue.qsize()} messages left")
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+    def wait_percentile(self, percentile):
+        if not self.wait_times:
+            return 0.0
+        ordered = sorted(self.wait_times)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+moderation_queue = ModerationQueue(MODERATION_QUEUE_SIZE, MODERATION_WORKERS, MODERATION_OVERFLOW)
+
+
+async def moderate_message_locally(message):
+    verdict, confidence = classify_locally(message.content)
+    if verdict and confidence >= LOCAL_THRESHOLDS[verdict]:
+        moderation_stats[f"local_{verdict.lower()}"] += 1
+        await apply_moderation_verdict(message, verdict)
+
+
+async def moderate_message(message):
+    evaluation = await moderate_message_content(message.content)
+    await apply_moderation_verdict(message, evaluation)
+
+
+async def apply_moderation_verdict(message, evaluation):
+    if evaluation == "DELETE":
+        ad_allowed = await check_ad_permission(message.author.id, message.content, message.channel)
+        
+        if ad_allowed:
+            return
             
-            muted_role = discord.utils.get(message.guild.roles, name="Muted")
-            if muted_role:
-                try:
-                    await message.author.add_roles(muted_role)
-                    
-                    try:
-                        await message.author.send(
-                            "Your message was removed and you have been muted now because it violated our community guidelines. "
-                            "Please refrain from posting promotional or advertisement content in our server."
-                        )
-                    except discord.errors.Forbidden:
-                        pass
-                        
-                except discord.errors.Forbidden:
-                    print(f"Couldn't mute user {message.author.name} - missing permissions")
-            else:
-                print("Muted role not found")
+        try:
+            deletion_channel = bot.get_channel(1352513103333560340)
+            if deletion_channel:
+                embed = discord.Embed(
+                    title="🚫 Message Deleted - Rule Violation",
+                    description=f"A message by {message.author.mention} in {message.channel.mention} was deleted for violating community guidelines.",
+                    color=discord.Color.red(),
+                    timestamp=datetime.datetime.utcnow()
+                )
                 
-        elif evaluation == "REDIRECT":
-            redirect_msg = await message.channel.send(
-                f"{message.author.mention}, it seems you're looking for services. "
-                f"Please message the owner directly or open a ticket in <#1326998748315914247> for assistance."
-            )
-            
+                embed.add_field(
+                    name="User",
+                    value=f"{message.author.mention} (`{message.author.name}`)",
+                    inline=True
+                )
+                
+                embed.add_field(
+                    name="Sent at",
+                    value=f"<t:{int(message.created_at.timestamp())}:F>",
+                    inline=True
+                )
+                
+                embed.add_field(
+                    name="Deleted Message",
+                    value=f"```{message.content[:1000]}{'...' if len(message.content) > 1000 else ''}```",
+                    inline=False
+                )
+
+                user_avatar_url = message.author.avatar.url if message.author.avatar else message.author.default_avatar.url
+                embed.set_thumbnail(url=user_avatar_url)
+                
+                embed.set_footer(text="LuvoWeb • Moderation Alert", icon_url=ICON_URL)
+                
+                await deletion_channel.send(embed=embed)
+            else:
+                print("Deletion notification channel not found")
+        except Exception as e:
+            print(f"Failed to send deletion notification: {str(e)}")
+        
+        await message.delete()
+        
+        muted_role = discord.utils.get(message.guild.roles, name="Muted")
+        if muted_role:
             try:
-                notification_channel = bot.get_channel(1352511817376731187)
-                if notification_channel:
-                    embed = discord.Embed(
-                        title="💼 Potential Client Detected",
-                        description=f"A user appears to be looking for services in {message.channel.mention}",
-                        color=discord.Color.from_rgb(66, 95, 71),
-                        timestamp=datetime.datetime.utcnow()
-                    )
-                    
-                    embed.add_field(
-                        name="User",
-                        value=f"{message.author.mention} (`{message.author.name}`)",
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="Sent at",
-                        value=f"<t:{int(message.created_at.timestamp())}:F>",
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="Original Message",
-                        value=f"```{message.content[:1000]}{'...' if len(message.content) > 1000 else ''}```",
-                        inline=False
+                await message.author.add_roles(muted_role)
+                
+                try:
+                    await message.author.send(
+                        "Your message was removed and you have been muted now because it violated our community guidelines. "
+                        "Please refrain from posting promotional or advertisement content in our server."
                     )
+                except discord.errors.Forbidden:
+                    pass
                     
-                    user_avatar_url = message.author.avatar.url if message.author.avatar else message.author.default_avatar.url
-                    embed.set_thumbnail(url=user_avatar_url)
-                    
-                    embed.set_footer(text="LuvoWeb • Potential Lead Alert", icon_url=ICON_URL)
-                    
-                    await notification_channel.send(f"<@273352781442842624>", embed=embed)
-                else:
-                    print("Notification channel not found")
-            except Exception as e:
-                print(f"Failed to send notification: {str(e)}")
+            except discord.errors.Forbidden:
+                print(f"Couldn't mute user {message.author.name} - missing permissions")
+        else:
+            print("Muted role not found")
             
-            await message.delete()
+    elif evaluation == "REDIRECT":
+        redirect_msg = await message.channel.send(
+            f"{message.author.mention}, it seems you're looking for services. "
+            f"Please message the owner directly or open a ticket in <#1326998748315914247> for assistance."
+        )
+        
+        try:
+            notification_channel = bot.get_channel(1352511817376731187)
+            if notification_channel:
+                embed = discord.Embed(
+                    title="💼 Potential Client Detected",
+                    description=f"A user appears to be looking for services in {message.channel.mention}",
+                    color=discord.Color.from_rgb(66, 95, 71),
+                    timestamp=datetime.datetime.utcnow()
+                )
+                
+                embed.add_field(
+                    name="User",
+                    value=f"{message.author.mention} (`{message.author.name}`)",
+                    inline=True
+                )
+                
+                embed.add_field(
+                    name="Sent at",
+                    value=f"<t:{int(message.created_at.timestamp())}:F>",
+                    inline=True
+                )
+                
+                embed.add_field(
+                    name="Original Message",
+                    value=f"```{message.content[:1000]}{'...' if len(message.content) > 1000 else ''}```",
+                    inline=False
+                )
+                
+                user_avatar_url = message.author.avatar.url if message.author.avatar else message.author.default_avatar.url
+                embed.set_thumbnail(url=user_avatar_url)
+                
+                embed.set_footer(text="LuvoWeb • Potential Lead Alert", icon_url=ICON_URL)
+                
+                await notification_channel.send(f"<@273352781442842624>", embed=embed)
+            else:
+                print("Notification channel not found")
+        except Exception as e:
+            print(f"Failed to send notification: {str(e)}")
+        
+        await message.delete()
+        
+        scheduler.delete_message_later(redirect_msg, 300)
+
+
+@bot.command(name="modstats")
+@commands.has_permissions(administrator=True)
+async def modstats_command(ctx):
+    local_total = sum(count for stage, count in moderation_stats.items() if stage.startswith("local_"))
+    total = local_total + moderation_stats["cache"] + moderation_stats["ai"] + moderation_stats["ai_failed"] + moderation_stats["degraded"]
+    
+    embed = discord.Embed(
+        title="🛡️ Moderation Stats",
+        color=discord.Color.from_rgb(66, 95, 71),
+        timestamp=datetime.datetime.utcnow()
+    )
+    embed.add_field(
+        name="Local Classifier",
+        value=f"```GOOD: {moderation_stats['local_good']}\nDELETE: {moderation_stats['local_delete']}\nREDIRECT: {moderation_stats['local_redirect']}```",
+        inline=True
+    )
+    embed.add_field(
+        name="Verdict Cache",
+        value=f"```Hits: {verdict_cache.hits}\nMisses: {verdict_cache.misses}\nSize: {len(verdict_cache.entries)}```",
+        inline=True
+    )
+    embed.add_field(
+        name="AI Moderator",
+        value=f"```Answered: {moderation_stats['ai']}\nFailed: {moderation_stats['ai_failed']}\nBatches: {moderation_stats['ai_batches']}\nFallbacks: {moderation_stats['batch_fallbacks']}\nDegraded: {moderation_stats['degraded']}```",
+        inline=True
+    )
+    embed.add_field(
+        name="Queue",
+        value=(
+            f"```Depth: {moderation_queue.queue.qsize() if moderation_queue.queue else 0}/{moderation_queue.max_size} (max {moderation_queue.max_depth})\n"
+            f"Wait p50/p95: {moderation_queue.wait_percentile(0.5):.2f}s/{moderation_queue.wait_percentile(0.95):.2f}s\n"
+            f"Dropped: {moderation_queue.dropped} | Shed: {moderation_queue.shed}```"
+        ),
+        inline=False
+    )
+    embed.add_field(
+        name="Resolved Locally",
+        value=f"```{local_total}/{total} ({(local_total / total * 100) if total else 0:.1f}%)```",
+        inline=False
+    )
+    embed.set_footer(text="LuvoWeb • Moderation", icon_url=ICON_URL)
+    
+    await ctx.send(embed=embed)
+
+
+@bot.command(name="aistats")
+@commands.has_permissions(administrator=True)
+async def aistats_command(ctx):
+    embed = discord.Embed(
+        title="🤖 AI Provider Stats",
+        description=f"Hedged requests: **{ai_router.hedges}** • Won by hedge: **{ai_router.hedge_wins}**",
+        color=discord.Color.from_rgb(66, 95, 71),
+        timestamp=datetime.datetime.utcnow()
+    )
+    for provider in sorted(ai_router.providers, key=lambda provider: (not provider.available(), provider.score())):
+        p50 = provider.percentile(0.5)
+        p95 = provider.percentile(0.95)
+        embed.add_field(
+            name=f"{'🟢' if provider.healthy() else '🔴'} {provider.name}",
+            value=(
+                f"```Model: {provider.model}\n"
+                f"Circuit: {provider.current_state()}\n"
+                f"Requests: {provider.requests}\n"
+                f"p50/p95: {f'{p50:.2f}s' if p50 is not None else '-'}/{f'{p95:.2f}s' if p95 is not None else '-'}\n"
+                f"Errors: {provider.error_rate() * 100:.0f}%```"
+            ),
+            inline=True
+        )
+    embed.set_footer(text="LuvoWeb • AI Routing", icon_url=ICON_URL)
+    
+    await ctx.send(embed=embed)
+
+
+@bot.command(name="synccommands")
+@commands.has_permissions(administrator=True)
+async def synccommands_command(ctx):
+    try:
+        await bot.sync_commands(force=True)
+        await ctx.send("<:check_yes:1351969576669151304> Slash commands synced.")
+    except Exception as e:
+        await ctx.send(f"Failed to sync commands: {str(e)[:200]}")
+
+
+@bot.command(name="poolstats")
+@commands.has_permissions(administrator=True)
+async def poolstats_command(ctx):
+    if not ticket_pool.size:
+        await ctx.send("The ticket pool is disabled. Set `TICKET_POOL_SIZE` to enable it.")
+        return
+    
+    p50 = ticket_pool.percentile(0.5)
+    p95 = ticket_pool.percentile(0.95)
+    embed = discord.Embed(
+        title="🎫 Ticket Pool Stats",
+        description=(
+            f"```Available: {len(ticket_pool.available)}/{ticket_pool.size} (low water {ticket_pool.low_water})\n"
+            f"Claimed: {ticket_pool.claims}\n"
+            f"Created fresh (pool empty): {ticket_pool.misses}\n"
+            f"Replenished: {ticket_pool.created}\n"
+            f"Claim p50/p95: {f'{p50:.0f}ms' if p50 is not None else '-'}/{f'{p95:.0f}ms' if p95 is not None else '-'}```"
+        ),
+        color=discord.Color.from_rgb(66, 95, 71),
+        timestamp=datetime.datetime.utcnow()
+    )
+    if ticket_pool.last_error:
+        embed.add_field(name="Last Error", value=f"```{ticket_pool.last_error[:1000]}```", inline=False)
+    embed.set_footer(text="LuvoWeb • Ticket Pool", icon_url=ICON_URL)
+    
+    await ctx.send(embed=embed)
+
+
+ASK_STOP_WORDS = {
+    "a", "an", "the", "is", "are", "do", "does", "did", "you", "your", "i", "me", "my", "we", "us",
+    "to", "of", "for", "in", "on", "and", "or", "it", "can", "what", "how", "please", "hey", "hi",
+    "guys", "there", "any", "much", "which", "will", "be", "this", "that",
+}
+
+
+def stem_word(word):
+    for suffix in ("ing", "es", "s"):
+        if len(word) > 4 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize_text(text):
+    return [
+        stem_word(word.replace("'", ""))
+        for word in re.findall(r"[a-z0-9']+", text.lower().replace("'s ", " "))
+        if word not in ASK_STOP_WORDS
+    ]
+
+
+def vectorize_text(text):
+    features = Counter()
+    words = tokenize_text(text)
+    for word in words:
+        features[zlib.crc32(word.encode("utf-8")) & 0xFFFFF] += 1.0
+        padded = f" {word} "
+        for index in range(len(padded) - 2):
+            features[zlib.crc32(padded[index:index + 3].encode("utf-8")) & 0xFFFFF] += 0.3
+    for left, right in zip(words, words[1:]):
+        features[zlib.crc32(f"{left} {right}".encode("utf-8")) & 0xFFFFF] += 1.5
+    
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    if not norm:
+        return {}
+    return {feature: weight / norm for feature, weight in features.items()}
+
+
+def cosine_similarity(left, right):
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(feature, 0.0) for feature, weight in left.items())
+
+
+class SemanticAnswerCache:
+    def __init__(self, max_size, threshold, ttl, path):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, question):
+        vector = vectorize_text(question)
+        if not vector:
+            return None
+        
+        now = time.time()
+        best_key, best_similarity = None, 0.0
+        for key, (_, _, entry_vector, stored_at) in list(self.entries.items()):
+            if now - stored_at > self.ttl:
+                del self.entries[key]
+                continue
+            similarity = cosine_similarity(vector, entry_vector)
+            if similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+        
+        if best_key is None or best_similarity < self.threshold:
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(best_key)
+        self.hits += 1
+        return self.entries[best_key][1], best_similarity
+
+    def store(self, question, answer):
+        vector = vectorize_text(question)
+        if not vector:
+            return
+        key = normalize_message_content(question)
+        self.entries[key] = (question, answer, vector, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Failed to load answer cache: {e}")
+            return
+        now = time.time()
+        for question, answer, stored_at in snapshot[-self.max_size:]:
+            if now - stored_at <= self.ttl:
+                self.entries[normalize_message_content(question)] = (question, answer, vectorize_text(question), stored_at)
+        print(f"Loaded {len(self.entries)} cached /ask answers")
+
+    def snapshot(self):
+        return [[question, answer, stored_at] for question, answer, _, stored_at in self.entries.values()]
+
+    def save(self, snapshot=None):
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Failed to save answer cache: {e}")
+
+
+answer_cache = SemanticAnswerCache(ASK_CACHE_SIZE, ASK_CACHE_THRESHOLD, ASK_CACHE_TTL, os.path.join(DATA_DIR, "answer_cache.json"))
+
+
+class PolicyIndex:
+    def __init__(self, sections, k1=1.5, b=0.75, title_boost=1.0, prefix_length=5, prefix_weight=0.8):
+        self.sections = sections
+        self.k1 = k1
+        self.b = b
+        self.title_boost = title_boost
+        self.prefix_length = prefix_length
+        self.prefix_weight = prefix_weight
+        self.postings = {}
+        self.lengths = []
+        self.title_terms = []
+        
+        for index, (_, title, text) in enumerate(sections):
+            self.title_terms.append({term for term in tokenize_text(title) if term != "rule" and not term.isdigit()})
+            terms = tokenize_text(title) * 3 + tokenize_text(text)
+            self.lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings.setdefault(term, []).append((index, frequency))
+        
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        self.idf = {
+            term: math.log(1 + (len(sections) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def expand(self, term):
+        if term in self.idf:
+            return [(term, 1.0)]
+        if len(term) < self.prefix_length:
+            return []
+        return [
+            (known, self.prefix_weight) for known in self.idf
+            if len(known) >= self.prefix_length and (known.startswith(term) or term.startswith(known))
+        ]
+
+    def search(self, query, limit=3):
+        terms = set(tokenize_text(query))
+        if not terms or not self.idf:
+            return []
+        
+        scores = Counter()
+        best_possible = 0.0
+        for term in terms:
+            matches = self.expand(term)
+            if not matches:
+                best_possible += min(self.idf.values()) * (self.k1 + 1)
+                continue
+            best_possible += max(self.idf[known] for known, _ in matches) * (self.k1 + 1) * (1 + self.title_boost)
             
-            await asyncio.sleep(300) 
-            try:
-                await redirect_msg.delete()
-            except discord.errors.NotFound:
-                pass
+            term_scores = Counter()
+            for known, weight in matches:
+                idf = self.idf[known]
+                for index, frequency in self.postings[known]:
+                    length_norm = 1 - self.b + self.b * self.lengths[index] / self.average_length
+                    score = idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                    if known in self.title_terms[index]:
+                        score += self.title_boost * idf * (self.k1 + 1)
+                    term_scores[index] = max(term_scores[index], weight * score)
+            scores.update(term_scores)
+        
+        return [
+            (score / best_possible, self.sections[index])
+            for index, score in scores.most_common(limit)
+        ]
+
+
+policy_index = PolicyIndex(
+    [("Rules", title, description) for title, description in RULE_SECTIONS]
+    + [("Terms of Service", title, description) for title, description in TERMS_SECTIONS]
+)
+
+
+def find_policy_answer(matches):
+    if not matches:
+        return None
+    top_score, top_section = matches[0]
+    runner_up = matches[1][0] if len(matches) > 1 else 0.0
+    if top_score >= POLICY_ANSWER_THRESHOLD and top_score >= runner_up * POLICY_ANSWER_MARGIN:
+        return top_section
+    return None
+
+
+def build_ask_prompt(question, matches):
+    passages = [section for score, section in matches if score >= POLICY_CONTEXT_THRESHOLD]
+    if not passages:
+        return question
+    context = "\n\n".join(f"[{source} - {title}] {text}" for source, title, text in passages)
+    return (
+        "You are the assistant for LuvoWeb, a web development agency. Use these excerpts from our rules and "
+        f"terms of service when they are relevant to the question:\n\n{context}\n\nQuestion: {question}"
+    )
+
+
+def build_ask_embed(interaction, question, answer, footer_note=None):
+    embed = discord.Embed(
+        color=discord.Color.from_rgb(66, 95, 71),
+        timestamp=datetime.datetime.utcnow()
+    )
+    
+    embed.description = f"**Question:**\n```{question[:1000]}{'...' if len(question) > 1000 else ''}```"
+    
+    embed.add_field(
+        name="AI Response",
+        value=answer[:1021] + "..." if len(answer) > 1024 else answer,
+        inline=False
+    )
+    
+    user_avatar_url = interaction.user.avatar.url if interaction.user.avatar else interaction.user.default_avatar.url
+    embed.set_thumbnail(url=user_avatar_url)
+    
+    embed.set_footer(
+        text=f"Requested by {interaction.user.name} • {footer_note + ' • ' if footer_note else ''}LuvoWeb",
+        icon_url=ICON_URL
+    )
+    return embed
+
+
+async def stream_ask_response(interaction, question, prompt):
+    response_message = None
+    answer = ""
+    last_edit = 0.0
+    complete = True
+    
+    stream = stream_ai_response(prompt)
+    try:
+        async for text in stream:
+            answer += text
+            if not answer.strip() or len(answer) - len(text) > 1024:
+                continue
+            
+            now = time.monotonic()
+            if response_message is None:
+                response_message = await interaction.followup.send(
+                    embed=build_ask_embed(interaction, question, answer + " ▌", "Generating..."),
+                    wait=True
+                )
+                last_edit = now
+            elif now - last_edit >= ASK_EDIT_INTERVAL:
+                await response_message.edit(embed=build_ask_embed(interaction, question, answer + " ▌", "Generating..."))
+                last_edit = now
+    except AIStreamTruncated as e:
+        print(f"Incomplete /ask answer: {e}")
+        complete = False
+    finally:
+        await stream.aclose()
+    
+    answer = answer.strip() or AI_FALLBACK_RESPONSE
+    footer_note = None if complete else "⚠️ Incomplete answer, the AI connection dropped"
+    if response_message is None:
+        await interaction.followup.send(embed=build_ask_embed(interaction, question, answer, footer_note))
+    else:
+        await response_message.edit(embed=build_ask_embed(interaction, question, answer, footer_note))
+    return answer, complete
 
 
 @bot.tree.command(name='ask', description='Ask a question to our AI assistant')
@@ -1098,30 +3359,40 @@ async def ask(interaction: discord.Interaction, question: str):
     await interaction.response.defer(ephemeral=False)
     
     try:
-        ai_response = await get_ai_response(question)
-        
-        embed = discord.Embed(
-            color=discord.Color.from_rgb(66, 95, 71),
-            timestamp=datetime.datetime.utcnow()
-        )
-        
-        embed.description = f"**Question:**\n```{question[:1000]}{'...' if len(question) > 1000 else ''}```"
-        
-        embed.add_field(
-            name="AI Response",
-            value=ai_response[:4000] if len(ai_response) > 4000 else ai_response,
-            inline=False
-        )
+        started = time.monotonic()
+        matches = policy_index.search(question)
+        policy_section = find_policy_answer(matches)
+        if policy_section:
+            source, title, text = policy_section
+            await interaction.followup.send(embed=build_ask_embed(
+                interaction,
+                question,
+                f"**{title}**\n{text}",
+                f"📕 Answered from our {source}"
+            ))
+            return
         
-        user_avatar_url = interaction.user.avatar.url if interaction.user.avatar else interaction.user.default_avatar.url
-        embed.set_thumbnail(url=user_avatar_url)
+        cached = answer_cache.lookup(question)
+        if cached:
+            answer, similarity = cached
+            await interaction.followup.send(embed=build_ask_embed(
+                interaction,
+                question,
+                answer,
+                f"⚡ Cached answer ({similarity * 100:.0f}% match, {(time.monotonic() - started) * 1000:.0f}ms)"
+            ))
+            return
         
-        embed.set_footer(
-            text=f"Requested by {interaction.user.name} • LuvoWeb",
-            icon_url=ICON_URL
-        )
+        prompt = build_ask_prompt(question, matches)
+        if ASK_STREAMING:
+            ai_response, complete = await stream_ask_response(interaction, question, prompt)
+        else:
+            ai_response = await get_ai_response(prompt)
+            complete = True
+            await interaction.followup.send(embed=build_ask_embed(interaction, question, ai_response))
         
-        await interaction.followup.send(embed=embed)
+        if complete and ai_response != AI_FALLBACK_RESPONSE:
+            answer_cache.store(question, ai_response)
         
     except Exception as e:
         error_embed = discord.Embed(
@@ -1133,5 +3404,52 @@ async def ask(interaction: discord.Interaction, question: str):
         await interaction.followup.send(embed=error_embed, ephemeral=True)
 
 
+@bot.tree.command(name='tickets', description='List your open tickets')
+async def tickets_command(interaction: discord.Interaction):
+    channel_ids = open_tickets.tickets(interaction.user.id)
+    
+    embed = discord.Embed(
+        title="🎫 Your Open Tickets",
+        description="\n".join(f"> <#{channel_id}>" for channel_id in channel_ids) or "You don't have any open tickets.",
+        color=discord.Color.green()
+    )
+    embed.set_footer(text=f"{len(channel_ids)}/{MAX_OPEN_TICKETS} open tickets • LuvoWeb", icon_url=ICON_URL)
+    
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@bot.tree.command(name='transcripts', description='Search closed ticket transcripts')
+@app_commands.default_permissions(administrator=True)
+async def transcripts_search(interaction: discord.Interaction, query: str):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You don't have permission to search transcripts.", ephemeral=True)
+        return
+    
+    started = time.monotonic()
+    try:
+        hits = await asyncio.to_thread(transcript_index.search, query)
+    except sqlite3.Error as e:
+        await interaction.response.send_message(f"Search failed: {str(e)[:200]}", ephemeral=True)
+        return
+    elapsed = (time.monotonic() - started) * 1000
+    
+    embed = discord.Embed(
+        title=f"🔎 Transcript Search - {query[:200]}",
+        color=discord.Color.blue(),
+        timestamp=datetime.datetime.utcnow()
+    )
+    if not hits:
+        embed.description = "No closed tickets matched your search."
+    for name, creator, closer, closed_at, author, ts, snippet in hits:
+        embed.add_field(
+            name=f"{name} • {author}"[:256],
+            value=f"> {snippet}\nSent <t:{int(ts)}:d> • Created by {creator} • Closed by {closer} <t:{int(closed_at)}:R>"[:1024],
+            inline=False
+        )
+    embed.set_footer(text=f"{len(hits)} results in {elapsed:.0f}ms • LuvoWeb", icon_url=ICON_URL)
+    
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
 if __name__ == "__main__":
     bot.run(TOKEN)
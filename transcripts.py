@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+import gzip
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from collections import deque
+
+TRANSCRIPT_CSS = """
+body { font-family: 'Segoe UI', Arial, sans-serif; margin: 0; padding: 20px; background: #f9f9f9; color: #333; }
+.ticket-info { background: #4A76A8; color: white; padding: 15px; border-radius: 8px; margin-bottom: 20px; }
+.ticket-title { font-size: 22px; margin: 0; }
+.ticket-meta { font-size: 14px; opacity: 0.8; margin-top: 5px; }
+.messages { display: flex; flex-direction: column; gap: 15px; }
+.message { display: flex; background: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); overflow: hidden; }
+.message-avatar { width: 50px; padding: 15px; }
+.message-avatar .avatar { display: block; width: 50px; height: 50px; border-radius: 50%; background-size: cover; }
+.message-content { flex: 1; padding: 15px 15px 15px 0; }
+.message-header { display: flex; align-items: center; margin-bottom: 5px; }
+.message-author { font-weight: bold; margin-right: 8px; }
+.message-timestamp { color: #888; font-size: 12px; }
+.message-text { margin-top: 5px; white-space: pre-wrap; }
+.message-attachments { margin-top: 10px; }
+.message-attachments a { display: inline-block; margin-right: 10px; color: #4A76A8; text-decoration: none; }
+.system-message { background: #f0f7ff; border-left: 4px solid #4A76A8; padding: 10px; margin: 5px 0; }
+.ticket-summary { color: #888; font-size: 12px; margin-top: 20px; text-align: center; }
+"""
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 1024 * 1024
+FOOTER_RESERVE = 1024
+ZIP_ENTRY_OVERHEAD = 128
+
+
+CSS_UNSAFE_RE = re.compile(r"[^A-Za-z0-9 _.,:/?=&%#+-]")
+
+
+def escape(value):
+    return html.escape(value or "", quote=True)
+
+
+def css_string(value):
+    return '"' + CSS_UNSAFE_RE.sub(lambda match: f"\\{ord(match.group(0)):x} ", value or "") + '"'
+
+
+def format_timestamp(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+
+
+def part_file(directory=None, suffix="", spool_size=SPOOL_SIZE):
+    if directory:
+        return tempfile.NamedTemporaryFile(dir=directory, suffix=suffix, delete=False)
+    return tempfile.SpooledTemporaryFile(max_size=spool_size)
+
+
+class TranscriptAuthor:
+    __slots__ = ("name", "avatar")
+
+    def __init__(self, name, avatar):
+        self.name = name
+        self.avatar = avatar
+
+
+class TranscriptMessage:
+    __slots__ = ("id", "author", "timestamp", "content", "embeds", "attachments")
+
+    def __init__(self, message_id, author, timestamp, content, embeds, attachments):
+        self.id = message_id
+        self.author = author
+        self.timestamp = timestamp
+        self.content = content
+        self.embeds = embeds
+        self.attachments = attachments
+
+
+class Transcript:
+    def __init__(self, channel_name, creator_name, closed_by, closed_at):
+        self.channel_name = channel_name
+        self.creator_name = creator_name
+        self.closed_by = closed_by
+        self.closed_at = closed_at
+        self.authors = []
+        self.author_index = {}
+        self.messages = []
+
+    def add_author(self, name, avatar):
+        key = (name, avatar)
+        index = self.author_index.get(key)
+        if index is None:
+            index = len(self.authors)
+            self.authors.append(TranscriptAuthor(sys.intern(name), sys.intern(avatar)))
+            self.author_index[key] = index
+        return index
+
+    def add_message(self, message_id, author_name, avatar, timestamp, content, embeds=(), attachments=()):
+        self.messages.append(TranscriptMessage(
+            message_id,
+            self.add_author(author_name, avatar),
+            timestamp,
+            content,
+            tuple(tuple(embed) for embed in embeds),
+            tuple(tuple(attachment) for attachment in attachments)
+        ))
+
+    @property
+    def message_count(self):
+        return len(self.messages)
+
+    def iter_messages(self):
+        return iter(self.messages)
+
+    def preview(self, head, tail):
+        first = []
+        last = deque(maxlen=tail)
+        for message in self.iter_messages():
+            if len(first) < head:
+                first.append(message)
+            else:
+                last.append(message)
+        return first + list(last)
+
+    def render_html(self, compress=False, max_part_size=None, links=None, directory=None):
+        writer = TranscriptWriter(
+            self.channel_name,
+            self.creator_name,
+            self.closed_by,
+            self.closed_at,
+            self.authors,
+            compress=compress,
+            max_part_size=max_part_size,
+            links=links,
+            directory=directory
+        )
+        for message in self.iter_messages():
+            writer.write_message(message.author, message.timestamp, message.content, message.embeds, message.attachments)
+        return writer.finish()
+
+    def export_ndjson(self, compress=False, directory=None):
+        file = part_file(directory, ".ndjson.gz" if compress else ".ndjson")
+        stream = gzip.GzipFile(fileobj=file, mode="wb") if compress else file
+        lines = [{
+            "type": "ticket",
+            "channel": self.channel_name,
+            "creator": self.creator_name,
+            "closed_by": self.closed_by,
+            "closed_at": self.closed_at,
+            "message_count": self.message_count
+        }]
+        lines.extend(
+            {"type": "author", "index": index, "name": author.name, "avatar": author.avatar}
+            for index, author in enumerate(self.authors)
+        )
+        stream.write("".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8"))
+        
+        chunk = []
+        for message in self.iter_messages():
+            chunk.append(json.dumps({
+                "type": "message",
+                "id": message.id,
+                "author": message.author,
+                "ts": message.timestamp,
+                "content": message.content,
+                "embeds": message.embeds,
+                "attachments": message.attachments
+            }, ensure_ascii=False) + "\n")
+            if len(chunk) >= 500:
+                stream.write("".join(chunk).encode("utf-8"))
+                chunk = []
+        if chunk:
+            stream.write("".join(chunk).encode("utf-8"))
+        
+        if compress:
+            stream.close()
+        file.seek(0)
+        return file
+
+
+class JournalTranscript(Transcript):
+    def __init__(self, path, size, channel_name, creator_name, closed_by, closed_at):
+        super().__init__(channel_name, creator_name, closed_by, closed_at)
+        self.path = path
+        self.size = size
+        self.index = []
+        self.edits = {}
+        self.scan()
+
+    def scan(self):
+        latest = {}
+        deleted = set()
+        authors = {}
+        offset = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if offset >= self.size:
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = {}
+                    op = record.get("op")
+                    if op == "message":
+                        author = (record["author"], record["avatar"])
+                        latest[record["id"]] = (offset, authors.setdefault(author, author))
+                        self.edits.pop(record["id"], None)
+                    elif op == "edit":
+                        self.edits.setdefault(record["id"], {}).update(
+                            (field, record[field]) for field in ("content", "embeds", "attachments") if record.get(field) is not None
+                        )
+                    elif op == "delete":
+                        deleted.add(record["id"])
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        
+        for message_id in sorted(latest):
+            if message_id not in deleted:
+                offset, author = latest[message_id]
+                self.index.append((message_id, offset, self.add_author(*author)))
+
+    @property
+    def message_count(self):
+        return len(self.index)
+
+    def iter_messages(self):
+        if not self.index:
+            return
+        with open(self.path, "rb") as f:
+            for message_id, offset, author in self.index:
+                f.seek(offset)
+                record = json.loads(f.readline())
+                record.update(self.edits.get(message_id, ()))
+                yield TranscriptMessage(
+                    message_id,
+                    author,
+                    record["ts"],
+                    record["content"],
+                    tuple(tuple(embed) for embed in record["embeds"]),
+                    tuple(tuple(attachment) for attachment in record["attachments"])
+                )
+
+
+def warm_worker():
+    return os.getpid()
+
+
+def render_transcript(source, directory, compress=False, max_part_size=None, links=None):
+    paths = []
+    for part in JournalTranscript(*source).render_html(compress, max_part_size, links, directory):
+        part.close()
+        paths.append(part.name)
+    return paths
+
+
+def export_transcript(source, directory, compress=False):
+    with JournalTranscript(*source).export_ndjson(compress, directory) as export_file:
+        return export_file.name
+
+
+class TranscriptWriter:
+    def __init__(self, channel_name, creator_name, closed_by, closed_at, authors, compress=False, max_part_size=None, spool_size=SPOOL_SIZE, links=None, directory=None):
+        self.channel_name = channel_name
+        self.links = links or {}
+        self.authors = authors
+        self.author_names = [escape(author.name) for author in authors]
+        self.author_styles = "".join(
+            f".a{index} .avatar{{background-image:url({css_string(author.avatar)})}}\n"
+            for index, author in enumerate(authors)
+        )
+        self.creator_name = creator_name
+        self.closed_by = closed_by
+        self.closed_at = closed_at
+        self.compress = compress
+        self.max_part_size = max_part_size
+        self.spool_size = spool_size
+        self.directory = directory
+        self.parts = []
+        self.message_count = 0
+        self.start_part()
+
+    def start_part(self):
+        self.file = part_file(self.directory, ".html.gz" if self.compress else ".html", self.spool_size)
+        self.stream = gzip.GzipFile(fileobj=self.file, mode="wb") if self.compress else self.file
+        self.chunks = []
+        self.buffered = 0
+        self.part_messages = 0
+        self.write_header()
+
+    def part_size(self):
+        if self.compress:
+            return self.file.tell() + self.buffered // 8
+        return self.file.tell() + self.buffered
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.buffered += len(data)
+        if self.buffered >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            self.stream.write(b"".join(self.chunks))
+            self.chunks = []
+            self.buffered = 0
+
+    def write_header(self):
+        part = f" (part {len(self.parts) + 1})" if self.parts else ""
+        self.write((
+            "<!DOCTYPE html>\n<html>\n<head>\n"
+            '<meta charset="UTF-8">\n'
+            '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+            f"<title>Ticket Transcript - {escape(self.channel_name)}{part}</title>\n"
+            f"<style>{TRANSCRIPT_CSS}{self.author_styles}</style>\n"
+            "</head>\n<body>\n"
+            '<div class="ticket-info">\n'
+            f'<h1 class="ticket-title">Ticket: {escape(self.channel_name)}{part}</h1>\n'
+            '<div class="ticket-meta">\n'
+            f"<div>Created by: {escape(self.creator_name)}</div>\n"
+            f"<div>Closed by: {escape(self.closed_by)} on {escape(self.closed_at)}</div>\n"
+            "</div>\n</div>\n"
+            '<div class="messages">\n'
+        ).encode("utf-8"))
+
+    def write_footer(self, last_part):
+        summary = f"Total Messages: {self.message_count}" if last_part else f"Continued in part {len(self.parts) + 2}"
+        self.write(f'</div>\n<div class="ticket-summary">{summary}</div>\n</body></html>'.encode("utf-8"))
+
+    def end_part(self, last_part):
+        self.write_footer(last_part)
+        self.flush()
+        if self.compress:
+            self.stream.close()
+        self.file.seek(0)
+        self.parts.append(self.file)
+
+    def write_message(self, author, timestamp, content, embeds=(), attachments=()):
+        parts = [
+            f'<div class="message a{author}">\n'
+            '<div class="message-avatar"><span class="avatar"></span></div>\n'
+            '<div class="message-content">\n'
+            '<div class="message-header">'
+            f'<span class="message-author">{self.author_names[author]}</span>'
+            f'<span class="message-timestamp">{format_timestamp(timestamp)}</span>'
+            "</div>\n"
+            f'<div class="message-text">{escape(content)}</div>\n'
+        ]
+        for title, description in embeds:
+            parts.append('<div class="system-message">')
+            if title:
+                parts.append(f"<strong>{escape(title)}</strong><br>")
+            if description:
+                parts.append(f"{escape(description)}<br>")
+            parts.append("</div>\n")
+        if attachments:
+            parts.append('<div class="message-attachments">')
+            for filename, url in attachments:
+                parts.append(f'<a href="{escape(self.links.get(url, url))}" target="_blank">{escape(filename)}</a> ')
+            parts.append("</div>\n")
+        parts.append("</div>\n</div>\n")
+        data = "".join(parts).encode("utf-8")
+        
+        if self.max_part_size and self.part_messages and self.part_size() + len(data) + FOOTER_RESERVE > self.max_part_size:
+            self.end_part(last_part=False)
+            self.start_part()
+        
+        self.message_count += 1
+        self.part_messages += 1
+        self.write(data)
+
+    def finish(self):
+        self.end_part(last_part=True)
+        return self.parts
+
+
+class TranscriptArchive:
+    def __init__(self, max_part_size=None, spool_size=SPOOL_SIZE, directory=None):
+        self.max_part_size = max_part_size
+        self.spool_size = spool_size
+        self.directory = directory
+        self.parts = []
+        self.archive = None
+
+    def start_part(self):
+        self.file = part_file(self.directory, ".zip", self.spool_size)
+        self.archive = zipfile.ZipFile(self.file, mode="w", allowZip64=True)
+        self.central_size = 0
+
+    def end_part(self):
+        self.archive.close()
+        self.file.seek(0)
+        self.parts.append(self.file)
+        self.archive = None
+
+    def add(self, name, file, size, compress=False, timestamp=None):
+        entry_size = size + ZIP_ENTRY_OVERHEAD + 2 * len(name.encode("utf-8"))
+        if self.archive is None:
+            self.start_part()
+        elif self.max_part_size and self.archive.filelist and self.file.tell() + self.central_size + entry_size > self.max_part_size:
+            self.end_part()
+            self.start_part()
+        
+        info = zipfile.ZipInfo(name, date_time=time.gmtime(timestamp or time.time())[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        file.seek(0)
+        with self.archive.open(info, mode="w", force_zip64=size > 0x7FFFFFFF) as entry:
+            shutil.copyfileobj(file, entry, CHUNK_SIZE)
+        self.central_size += ZIP_ENTRY_OVERHEAD + len(name.encode("utf-8"))
+
+    def finish(self):
+        if self.archive is not None:
+            self.end_part()
+        return self.parts